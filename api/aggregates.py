@@ -0,0 +1,63 @@
+"""
+Server-side aggregates for the dashboard charts
+
+Distributions for every categorical field (multi-select list fields exploded
+per choice) come from the trigger-maintained option counters; completion-time
+percentiles and the average come from one walk of its index. The response
+stays a few KB no matter how many surveys exist.
+"""
+
+import sqlite3
+
+from database import CATEGORICAL_FIELDS, LIST_FIELDS, count_surveys, fetch_option_counts
+
+COMPLETION_PERCENTILES = [50, 75, 90, 95, 99]
+
+# One ordered walk of the completion_time index: each distinct value with its count
+COMPLETION_COUNTS_SQL = """
+    SELECT completion_time, COUNT(*) FROM survey_responses
+    WHERE completion_time IS NOT NULL
+    GROUP BY completion_time
+    ORDER BY completion_time
+"""
+
+def field_distribution(conn: sqlite3.Connection, field: str) -> list:
+    """Chart-ready [{name, value}] counts for one field, most common first"""
+    if field not in CATEGORICAL_FIELDS and field not in LIST_FIELDS:
+        raise ValueError(f"Field is not categorical: {field}")
+    return [{"name": name, "value": count} for name, count in fetch_option_counts(conn, field)]
+
+def completion_time_summary(conn: sqlite3.Connection) -> dict:
+    """Average, min/max and percentiles of completion_time (seconds)
+
+    Everything comes from a single index walk; the running count locates each
+    nearest-rank percentile.
+    """
+    counts = conn.execute(COMPLETION_COUNTS_SQL).fetchall()
+    count = sum(n for _, n in counts)
+    summary = {
+        "count": count,
+        "average": round(sum(value * n for value, n in counts) / count, 1) if count else None,
+        "min": counts[0][0] if counts else None,
+        "max": counts[-1][0] if counts else None,
+    }
+    ranks = [(pct, max(1, -(-pct * count // 100))) for pct in COMPLETION_PERCENTILES]
+    seen = 0
+    for value, n in counts:
+        seen += n
+        while ranks and ranks[0][1] <= seen:
+            summary[f"p{ranks.pop(0)[0]}"] = value
+    for pct, _ in ranks:
+        summary[f"p{pct}"] = None
+    return summary
+
+def compute_aggregates(conn: sqlite3.Connection) -> dict:
+    """Every dashboard distribution plus completion time statistics"""
+    return {
+        "total": count_surveys(conn),
+        "distributions": {
+            field: field_distribution(conn, field)
+            for field in CATEGORICAL_FIELDS + LIST_FIELDS
+        },
+        "completion_time": completion_time_summary(conn),
+    }
@@ -0,0 +1,160 @@
+"""
+Background AI analysis jobs for stored surveys
+
+POST /api/surveys/{id}/analysis only enqueues the survey id. A fixed pool of
+worker tasks builds the prompt from the stored row, calls the LLM through the
+shared scheduler and cache, and writes the result to the survey's ai_analysis
+column. Job state is kept in memory for polling; finished analyses live in the
+database, so a restart only forgets jobs that had not completed yet.
+
+Jobs do not wait out upstream incidents: with the circuit open, after a
+bounded number of scheduler rejections, or when the call fails, the job stores
+the local analysis tagged LOCAL_ANALYSIS_VERSION, which reanalyze.py --stale
+later upgrades.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import llm
+from database import ConnectionPool, fetch_survey, update_survey_analysis
+from llm import (
+    ANALYSIS_SYSTEM_PROMPT, ANALYSIS_VERSION, LLM_MAX_IN_FLIGHT, OPENROUTER_MODEL, CircuitOpen,
+    SchedulerBusy, build_analysis_prompt, request_analysis,
+)
+from llm_cache import AnalysisCache, cache_key
+from local_analysis import LOCAL_ANALYSIS_VERSION, generate_local_analysis
+
+# Job configuration; by default one worker per scheduler slot
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(LLM_MAX_IN_FLIGHT)))
+ANALYSIS_QUEUE_SIZE = int(os.getenv("ANALYSIS_QUEUE_SIZE", "1000"))
+ANALYSIS_JOB_HISTORY = int(os.getenv("ANALYSIS_JOB_HISTORY", "10000"))
+# Times a job waits for a scheduler slot again before storing the local analysis
+ANALYSIS_BUSY_RETRIES = int(os.getenv("ANALYSIS_BUSY_RETRIES", "2"))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+class AnalysisJobs:
+    """Bounded job queue drained by a pool of analysis worker tasks"""
+
+    def __init__(self, pool: ConnectionPool, cache: AnalysisCache, workers: int = ANALYSIS_WORKERS,
+                 queue_size: int = ANALYSIS_QUEUE_SIZE, history: int = ANALYSIS_JOB_HISTORY,
+                 busy_retries: int = ANALYSIS_BUSY_RETRIES):
+        self.pool = pool
+        self.cache = cache
+        self.workers = max(workers, 1)
+        self.queue_size = queue_size
+        self.history = history
+        self.busy_retries = busy_retries
+        self.jobs = OrderedDict()  # survey_id -> job dict, oldest first
+        self.completed = 0
+        self.local = 0
+        self.failed = 0
+        self._queue = None
+        self._tasks = []
+
+    def start(self):
+        """Start the worker tasks on the running event loop"""
+        if not self._tasks:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop the workers; queued and running jobs are abandoned"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, survey_id: int) -> dict:
+        """Queue an analysis for a survey, or return its already active job
+
+        Raises asyncio.QueueFull when the queue is at capacity.
+        """
+        job = self.jobs.get(survey_id)
+        if job and job["status"] in ACTIVE_STATUSES:
+            return job
+        self._queue.put_nowait(survey_id)
+        job = {"survey_id": survey_id, "status": "queued", "error": None, "source": None,
+               "queued_at": time.time(), "finished_at": None}
+        self.jobs.pop(survey_id, None)
+        self.jobs[survey_id] = job
+        self._trim()
+        return job
+
+    def status(self, survey_id: int) -> Optional[dict]:
+        """The latest job for a survey, if one is still remembered"""
+        return self.jobs.get(survey_id)
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def _trim(self):
+        # Forget the oldest finished jobs; active ones are bounded by the queue size
+        excess = len(self.jobs) - self.history
+        for survey_id in list(self.jobs):
+            if excess <= 0:
+                break
+            if self.jobs[survey_id]["status"] not in ACTIVE_STATUSES:
+                del self.jobs[survey_id]
+                excess -= 1
+
+    async def _work(self):
+        while True:
+            survey_id = await self._queue.get()
+            job = self.jobs[survey_id]
+            job["status"] = "running"
+            try:
+                source = await self._analyze(survey_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Analysis job for survey {survey_id} failed: {str(e)}")
+                job.update(status="failed", error=str(e))
+                self.failed += 1
+            else:
+                job.update(status="done", source=source)
+                if source == "llm":
+                    self.completed += 1
+                else:
+                    self.local += 1
+            finally:
+                job["finished_at"] = time.time()
+                self._queue.task_done()
+
+    async def _analyze(self, survey_id: int) -> str:
+        """Store an analysis for the survey; returns its source, llm or local"""
+        survey = await self.pool.read(fetch_survey, survey_id, None)
+        if survey is None:
+            raise LookupError("Survey not found")
+
+        analysis = await self._request_llm(survey_id, survey) if llm.openai_client else None
+        if analysis is None:
+            source, analysis, version = "local", generate_local_analysis(survey), LOCAL_ANALYSIS_VERSION
+        else:
+            source, version = "llm", ANALYSIS_VERSION
+        if not await self.pool.write(update_survey_analysis, survey_id, analysis, version):
+            raise LookupError("Survey not found")
+        return source
+
+    async def _request_llm(self, survey_id: int, survey: dict) -> Optional[str]:
+        """The LLM analysis, or None when upstream is unavailable"""
+        prompt = build_analysis_prompt(survey)
+        key = cache_key(OPENROUTER_MODEL, ANALYSIS_SYSTEM_PROMPT, prompt)
+        for attempt in range(self.busy_retries + 1):
+            try:
+                return await self.cache.get_or_create(key, lambda: request_analysis(prompt))
+            except CircuitOpen:
+                return None
+            except SchedulerBusy as e:
+                if attempt == self.busy_retries:
+                    return None
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                # The scheduler already retried transient errors
+                print(f"LLM analysis for survey {survey_id} failed, storing the local analysis: {str(e)}")
+                return None
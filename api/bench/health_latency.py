@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark /health latency while POST /api/surveys runs concurrently
+
+Starts the API twice against a scratch database: once with DB_WORKERS=0
+(queries inline on the event loop, the old behaviour) and once with the
+database executor enabled, then prints p50/p99 /health latency for each.
+
+The writers run in a separate process with their own client, so the /health
+prober's timings are not skewed by scheduling the load on the same event loop.
+
+Usage (from the api directory):
+    pip install -r bench/requirements.txt
+    python bench/health_latency.py --duration 10 --writers 16
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_SURVEY = {
+    "age_group": "25-34",
+    "current_activity": ["עובד/ת במשרה מלאה"],
+    "self_definition": "סקרן/ית",
+    "known_ai_tools": ["ChatGPT", "Claude"],
+    "ai_usage_level": "משתמש/ת מדי פעם",
+    "main_ai_goal": "לשפר פרודוקטיביות",
+    "ai_barriers": ["חוסר זמן"],
+    "completion_time": 180,
+}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def wait_until_up(client: httpx.AsyncClient, url: str, timeout: float = 15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get(url)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not start")
+
+async def write_load(base_url: str, duration: float, writers: int) -> int:
+    inserted = 0
+    stop = time.monotonic() + duration
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        async def writer():
+            nonlocal inserted
+            while time.monotonic() < stop:
+                await client.post("/api/surveys", json=SAMPLE_SURVEY)
+                inserted += 1
+
+        await asyncio.gather(*(writer() for _ in range(writers)))
+    return inserted
+
+def writer_process(base_url: str, duration: float, writers: int, results: multiprocessing.Queue):
+    results.put(asyncio.run(write_load(base_url, duration, writers)))
+
+async def probe(base_url: str, duration: float) -> list:
+    latencies = []
+    stop = time.monotonic() + duration
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        while time.monotonic() < stop:
+            started = time.perf_counter()
+            await client.get("/health")
+            latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.005)
+    return latencies
+
+def run_load(base_url: str, duration: float, writers: int) -> dict:
+    async def up():
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            await wait_until_up(client, "/health")
+    asyncio.run(up())
+
+    # Probing starts after the writers have ramped up and ends before they stop
+    warmup = 0.5
+    results = multiprocessing.Queue()
+    load = multiprocessing.Process(target=writer_process, args=(base_url, duration + 2 * warmup, writers, results))
+    load.start()
+    time.sleep(warmup)
+    latencies = asyncio.run(probe(base_url, duration))
+    inserted = results.get()
+    load.join()
+
+    return {
+        "health_requests": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "inserts_per_s": round(inserted / (duration + 2 * warmup), 1),
+    }
+
+def run_scenario(name: str, db_workers: int, args) -> dict:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ, DB_FILE=os.path.join(scratch, "bench.db"), DB_WORKERS=str(db_workers))
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=API_DIR, env=env,
+        )
+        try:
+            result = run_load(f"http://127.0.0.1:{port}", args.duration, args.writers)
+        finally:
+            server.terminate()
+            server.wait()
+    result["scenario"] = name
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    parser.add_argument("--writers", type=int, default=16, help="concurrent POST /api/surveys streams")
+    parser.add_argument("--workers", type=int, default=5, help="DB_WORKERS for the executor scenario")
+    args = parser.parse_args()
+
+    results = [
+        run_scenario("before (inline)", 0, args),
+        run_scenario(f"after (executor, {args.workers} workers)", args.workers, args),
+    ]
+
+    print(f"{'scenario':<32} {'p50 ms':>8} {'p99 ms':>8} {'inserts/s':>10}")
+    for result in results:
+        print(f"{result['scenario']:<32} {result['p50_ms']:>8} {result['p99_ms']:>8} {result['inserts_per_s']:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Write synthetic survey responses as NDJSON for benchmarking import_responses.py
+
+Records come from load_test.synthetic_survey, so they use the survey's own
+answer vocabularies and stitched free text, and a given --seed always produces
+the same file.
+
+Usage (from the api directory):
+    python bench/import_fixture.py 100000 > /tmp/import.ndjson
+    python ../import_responses.py /tmp/import.ndjson --db /tmp/import.db
+"""
+
+import argparse
+import json
+import random
+import sys
+
+from load_test import synthetic_survey
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("rows", type=int, help="number of responses to write")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    out = sys.stdout
+    for _ in range(args.rows):
+        out.write(json.dumps(synthetic_survey(rng), ensure_ascii=False))
+        out.write("\n")
+
+if __name__ == "__main__":
+    main()
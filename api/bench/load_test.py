@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Load test for the survey API with a JSON report for regression tracking
+
+Starts the mock OpenAI server and the API against a scratch database (or
+targets --base-url; server settings such as LLM_RATE_PER_MINUTE are passed
+through from the environment), seeds it with synthetic Hebrew responses drawn from the
+survey's own answer vocabularies, then drives each scenario with concurrent
+async clients for a fixed duration. Reports throughput, error counts and
+latency percentiles per scenario; --compare prints the change against an
+earlier report.
+
+Usage (from the api directory):
+    pip install -r bench/requirements.txt
+    python bench/load_test.py --duration 10 --concurrency 32 --output report.json
+    python bench/load_test.py --scenarios analyze --llm-latency 1.5 --llm-error-rate 0.2
+    python bench/load_test.py --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+
+import httpx
+
+from health_latency import API_DIR, free_port, percentile, wait_until_up
+
+# Answer options, as offered by frontend/src/pages/Survey.jsx
+SINGLE_CHOICE = {
+    "age_group": ['15–17', '18–21', '22–26', '27–30'],
+    "self_definition": ['יצירתי', 'טכנולוגי', 'יזמי', 'מחפש משמעות', 'שילוב של כמה דברים'],
+    "ai_usage_level": ['כן – ואני משתמש באופן קבוע', 'כן – ניסיתי אבל לא הבנתי איך',
+                       'לא – אבל אני ממש רוצה ללמוד', 'לא מכיר בכלל'],
+    "main_ai_goal": ['לחסוך זמן ולשפר יעילות', 'לשפר פרודוקטיביות בעבודה/לימודים', 'להגביר יצירתיות ורעיונות',
+                     'לרכוש מיומנות טכנולוגית', 'לפתור בעיות ספציפיות', 'להיות בחזית הטכנולוגיה',
+                     'הזדמנויות עסקיות/הכנסה'],
+    "monthly_spending": ['0 ש"ח', 'עד 20 ש"ח', '20–100 ש"ח', 'מעל 100 ש"ח', 'אני לא משלם – משתמש רק בכלים חינמיים'],
+    "community_interest": ['ברור שכן', 'אולי – אם זה פשוט ונגיש', 'לא מעניין אותי'],
+    "specific_ai_help": ['הדרכה על כלי ספציפי', 'הבנת עקרונות AI בסיסיים', 'רעיונות ופרויקטים יישומיים',
+                         'חיבור למנטור/מומחה', 'תמיכה טכנית'],
+    "investment_willingness": ['0 ש"ח', 'עד 20 ש"ח', '20-50 ש"ח', '50-100 ש"ח', 'מעל 100 ש"ח'],
+    "platform_access": ['כן', 'לא'],
+}
+MULTIPLE_CHOICE = {
+    "current_activity": ['תלמיד תיכון', 'חייל משוחרר', 'סטודנט', 'עובד במשרה מלאה', 'עצמאי / יזם',
+                         'עדיין מחפש את עצמי'],
+    "known_ai_tools": ['ChatGPT', 'Midjourney', 'Runway', 'DALL·E', 'Leonardo', 'Make / Zapier'],
+    "ai_learning_method": ['אונליין (קורסים, יוטיוב, בלוגים)', 'ניסוי וטעייה עצמאית',
+                           'קהילות וקבוצות (וואטסאפ, פייסבוק)', 'סדנאות / וובינרים', 'חברים / עמיתים'],
+    "ai_barriers": ['הכל באנגלית', 'אני לא מבין איך זה עובד', 'אין לי כסף להשקיע בזה',
+                    'אני לבד ואין לי ממי ללמוד', 'אני לא סומך על זה'],
+}
+# Free-text answers are stitched from fragments so term counts and search see varied text
+FREE_TEXT = {
+    "biggest_ai_challenge": (['למצוא זמן', 'להבין', 'לבחור', 'ללמוד'],
+                             ['את הכלים הנכונים', 'איך לכתוב פרומפטים', 'מה באמת שווה', 'לעבוד באנגלית']),
+    "ai_creation_dream": (['אפליקציה', 'בוט', 'אתר', 'סרטון', 'עסק קטן'],
+                          ['שעוזרת ללמוד', 'לניהול הזמן', 'שמסכם שיעורים', 'עם תמונות מ-Midjourney',
+                           'שמדבר עברית']),
+    "future_ai_impact": (['לעבוד חכם יותר', 'לפתוח עסק', 'להתקדם בקריירה', 'ליצור יותר'],
+                         ['בעזרת ChatGPT', 'בלי לבזבז זמן', 'בתחום שאני אוהב', 'עם קהילה תומכת']),
+}
+
+ANALYZE_PROMPT = "נתח את תשובות השאלון ותן המלצות מותאמות אישית. מזהה בקשה: {n}"
+
+def synthetic_survey(rng: random.Random) -> dict:
+    """One plausible survey response"""
+    survey = {field: rng.choice(options) for field, options in SINGLE_CHOICE.items()}
+    for field, options in MULTIPLE_CHOICE.items():
+        survey[field] = rng.sample(options, rng.randint(1, 3))
+    for field, (openings, endings) in FREE_TEXT.items():
+        survey[field] = f"{rng.choice(openings)} {rng.choice(endings)}"
+    survey["completion_time"] = int(rng.lognormvariate(5.3, 0.5))
+    return survey
+
+class Scenario(ABC):
+    """Request factory for one scenario; next() returns (method, path, json body)"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    @abstractmethod
+    def next(self) -> tuple:
+        """The next request as (method, path, json body or None)"""
+
+class CreateSurveys(Scenario):
+    def next(self):
+        return "POST", "/api/surveys", synthetic_survey(self.rng)
+
+class ListSurveys(Scenario):
+    def next(self):
+        return "GET", f"/api/surveys?limit=100&offset={self.rng.choice([0, 0, 0, 100, 500])}", None
+
+class Stats(Scenario):
+    def next(self):
+        return "GET", "/api/surveys/stats", None
+
+class Analyze(Scenario):
+    engine = "auto"
+
+    def next(self):
+        # Unique prompts, so every request reaches the LLM tier instead of the analysis cache
+        body = {"prompt": ANALYZE_PROMPT.format(n=f"{self.rng.random():.12f}"),
+                "responses": synthetic_survey(self.rng), "engine": self.engine}
+        return "POST", "/api/ai/analyze", body
+
+class Mixed(Scenario):
+    """Dashboard-like traffic: mostly reads, some submissions and analyses"""
+
+    WEIGHTS = [(ListSurveys, 5), (Stats, 3), (CreateSurveys, 2), (Analyze, 1)]
+
+    def __init__(self, rng: random.Random):
+        super().__init__(rng)
+        self.scenarios = [cls(rng) for cls, _ in self.WEIGHTS]
+        self.weights = [weight for _, weight in self.WEIGHTS]
+
+    def next(self):
+        return self.rng.choices(self.scenarios, self.weights)[0].next()
+
+SCENARIOS = {"create": CreateSurveys, "list": ListSurveys, "stats": Stats, "analyze": Analyze, "mixed": Mixed}
+
+def summarize(latencies: list, statuses: Counter, sources: Counter, elapsed: float) -> dict:
+    """Throughput and latency percentiles (ms) for one scenario"""
+    total = sum(statuses.values())
+    errors = sum(count for status, count in statuses.items()
+                 if not (status.isdigit() and 200 <= int(status) < 400))
+    summary = {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0,
+        "throughput_rps": round(total / elapsed, 1),
+        "statuses": dict(sorted(statuses.items())),
+    }
+    if latencies:
+        summary["latency_ms"] = {
+            "mean": round(statistics.fmean(latencies), 2),
+            "p50": round(percentile(latencies, 50), 2),
+            "p90": round(percentile(latencies, 90), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies), 2),
+        }
+    if sources:
+        summary["analysis_sources"] = dict(sources)
+    return summary
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, concurrency: int, duration: float) -> dict:
+    latencies = []
+    statuses = Counter()
+    sources = Counter()
+    stop = time.monotonic() + duration
+
+    async def worker():
+        while time.monotonic() < stop:
+            method, path, body = scenario.next()
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[str(response.status_code)] += 1
+            if path == "/api/ai/analyze" and response.status_code == 200:
+                sources[response.json().get("source", "unknown")] += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, sources, time.monotonic() - started)
+
+async def seed(client: httpx.AsyncClient, rows: int, rng: random.Random, batch: int = 5000):
+    """Bulk import synthetic responses so read scenarios have data to page through"""
+    for start in range(0, rows, batch):
+        surveys = [synthetic_survey(rng) for _ in range(min(batch, rows - start))]
+        response = await client.post("/api/surveys/bulk", json=surveys, timeout=120)
+        response.raise_for_status()
+
+async def run_all(base_url: str, args) -> dict:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        await wait_until_up(client, "/health")
+        if args.seed_rows:
+            await seed(client, args.seed_rows, rng)
+        results = {}
+        for name in args.scenarios:
+            print(f"running {name} ({args.duration:g}s, concurrency {args.concurrency})", file=sys.stderr)
+            results[name] = await run_scenario(client, SCENARIOS[name](rng), args.concurrency, args.duration)
+    return results
+
+def start_process(command: list, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(command, cwd=API_DIR, env=env)
+
+def run_local(args) -> tuple:
+    """Run against a fresh API + mock LLM; returns (results, server settings)"""
+    mock_port, api_port = free_port(), free_port()
+    settings = {
+        "llm_latency_s": args.llm_latency,
+        "llm_error_rate": args.llm_error_rate,
+        "seed_rows": args.seed_rows,
+    }
+    processes = []
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ,
+                   DB_FILE=os.path.join(scratch, "bench.db"),
+                   LLM_CACHE_DB=os.path.join(scratch, "llm_cache.db"),
+                   OPENROUTER_API_KEY="bench",
+                   OPENROUTER_BASE_URL=f"http://127.0.0.1:{mock_port}/v1")
+        try:
+            processes.append(start_process(
+                [sys.executable, "bench/mock_openai.py", "--port", str(mock_port),
+                 "--latency", str(args.llm_latency), "--error-rate", str(args.llm_error_rate)], env))
+            processes.append(start_process(
+                [sys.executable, "-m", "uvicorn", "main:app", "--port", str(api_port), "--log-level", "warning"], env))
+            results = asyncio.run(run_all(f"http://127.0.0.1:{api_port}", args))
+            settings["llm_upstream_calls"] = httpx.get(f"http://127.0.0.1:{mock_port}/stats").json()["calls"]
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                process.wait()
+    return results, settings
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=API_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_summary(results: dict, baseline: dict = None):
+    print(f"{'scenario':<10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, result in results.items():
+        latency = result.get("latency_ms", {})
+        print(f"{name:<10} {result['throughput_rps']:>9} {latency.get('p50', '-'):>9} "
+              f"{latency.get('p95', '-'):>9} {latency.get('p99', '-'):>9} {result['errors']:>7}")
+        previous = (baseline or {}).get(name)
+        if previous and previous.get("latency_ms") and latency:
+            def change(now, before):
+                return f"{(now - before) / before:+.0%}" if before else "n/a"
+            print(f"{'  vs base':<10} {change(result['throughput_rps'], previous['throughput_rps']):>9} "
+                  f"{change(latency['p50'], previous['latency_ms']['p50']):>9} "
+                  f"{change(latency['p95'], previous['latency_ms']['p95']):>9} "
+                  f"{change(latency['p99'], previous['latency_ms']['p99']):>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", help="test a running API instead of starting one (no mock LLM, no seeding)")
+    parser.add_argument("--scenarios", default="create,list,stats,analyze,mixed",
+                        help=f"comma separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients per scenario")
+    parser.add_argument("--seed-rows", type=int, default=10000, help="synthetic responses imported before the run")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the generated traffic")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="mock LLM latency in seconds")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="share of mock LLM calls failing")
+    parser.add_argument("--engine", choices=["auto", "llm", "local"], default="auto",
+                        help="analysis engine requested by the analyze traffic")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON report to print changes against")
+    args = parser.parse_args()
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    Analyze.engine = args.engine
+
+    if args.base_url:
+        args.seed_rows = 0
+        results, settings = asyncio.run(run_all(args.base_url, args)), {"base_url": args.base_url}
+    else:
+        results, settings = run_local(args)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "duration_s": args.duration,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "engine": args.engine,
+            "server": settings,
+        },
+        "scenarios": results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["scenarios"]
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print_summary(results, baseline)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        if baseline:
+            print_summary(results, baseline)
+
+if __name__ == "__main__":
+    main()
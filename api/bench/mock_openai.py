@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Minimal OpenAI-compatible chat completions server for local testing
+
+Answers POST /v1/chat/completions (plain and stream=True) with a canned Hebrew
+analysis after a configurable delay, and fails a configurable share of calls
+with 429/500 so retries and fallbacks can be exercised without OpenRouter.
+
+Usage (from the api directory):
+    python bench/mock_openai.py --port 9000 --latency 0.5 --error-rate 0.1
+    OPENROUTER_API_KEY=test OPENROUTER_BASE_URL=http://127.0.0.1:9000/v1 python main.py
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MOCK_ANALYSIS = """🎯 **פרופיל אישי**
+אתה סקרן ופתוח לטכנולוגיות חדשות.
+
+🚀 **המלצות לכלי AI**
+1. ChatGPT
+2. Claude
+3. Perplexity
+
+✨ בהצלחה!"""
+
+def create_app(latency: float = 0.0, error_rate: float = 0.0, chunk_delay: float = 0.0) -> FastAPI:
+    """Build the mock app; latency and chunk_delay are in seconds"""
+    app = FastAPI(title="Mock OpenAI")
+    app.state.calls = 0
+
+    def completion_id() -> str:
+        return f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls += 1
+        await asyncio.sleep(latency)
+        if random.random() < error_rate:
+            status = random.choice([429, 500])
+            return JSONResponse({"error": {"message": "mock failure", "code": status}}, status_code=status)
+
+        model = body.get("model", "mock")
+        created = int(time.time())
+        if not body.get("stream"):
+            return {
+                "id": completion_id(),
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": MOCK_ANALYSIS},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+
+        async def events():
+            chunk_id = completion_id()
+            for line in MOCK_ANALYSIS.splitlines(keepends=True):
+                chunk = {
+                    "id": chunk_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": line}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                if chunk_delay:
+                    await asyncio.sleep(chunk_delay)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return {"calls": app.state.calls}
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before answering")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls failing with 429/500")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    args = parser.parse_args()
+    app = create_app(args.latency, args.error_rate, args.chunk_delay)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
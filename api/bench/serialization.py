@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: building one large GET /api/surveys page
+
+Compares, on the same page of rows:
+  stdlib   - fetch_surveys() dicts + jsonable_encoder + json.dumps (FastAPI's default path)
+  orjson   - fetch_surveys() dicts + orjson
+  direct   - fetch_surveys_json(): rows rendered by SQLite's json_object, no per-row dicts
+
+Usage (from the api directory):
+    python bench/serialization.py --rows 10000 --repeat 5
+    python bench/serialization.py --db survey_responses.db --rows 10000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+
+from database import bulk_insert_surveys, connect, fetch_surveys, fetch_surveys_json, init_db
+from serialization import orjson
+
+SAMPLE_SURVEY = {
+    "age_group": "22–26",
+    "current_activity": ["סטודנט", "עובד במשרה מלאה"],
+    "self_definition": "טכנולוגי",
+    "known_ai_tools": ["ChatGPT", "Midjourney", "Make / Zapier"],
+    "ai_usage_level": "כן – ואני משתמש באופן קבוע",
+    "ai_learning_method": ["ניסוי וטעייה עצמאית", "סדנאות / וובינרים"],
+    "main_ai_goal": "לחסוך זמן ולשפר יעילות",
+    "biggest_ai_challenge": "למצוא זמן ללמוד כלים חדשים",
+    "ai_barriers": ["הכל באנגלית"],
+    "community_interest": "ברור שכן",
+    "completion_time": 240,
+    "ai_analysis": "🎯 **הפרופיל האישי שלך**\n" + "המלצה מותאמת אישית. " * 40,
+}
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serialization of a large survey page")
+    parser.add_argument("--db", help="existing database (default: a scratch database)")
+    parser.add_argument("--rows", type=int, default=10000, help="rows in the page (default 10000)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = args.db
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        init_db(path)
+        conn = connect(path)
+        with conn:
+            bulk_insert_surveys(conn, [dict(SAMPLE_SURVEY, completion_time=i) for i in range(args.rows)])
+        conn.close()
+
+    conn = connect(path, readonly=True)
+    limit = args.rows
+    results = {
+        "query_and_decode": timed(lambda: fetch_surveys(conn, limit), args.repeat),
+        "stdlib": timed(lambda: json.dumps(jsonable_encoder(fetch_surveys(conn, limit)), ensure_ascii=False,
+                                           separators=(",", ":")).encode("utf-8"), args.repeat),
+        "direct": timed(lambda: fetch_surveys_json(conn, limit), args.repeat),
+    }
+    if orjson is not None:
+        results["orjson"] = timed(lambda: orjson.dumps(fetch_surveys(conn, limit)), args.repeat)
+    body_bytes = len(fetch_surveys_json(conn, limit))
+    conn.close()
+
+    print(f"{limit} rows, {body_bytes / 1e6:.1f} MB body, median of {args.repeat} runs")
+    for name in ("query_and_decode", "stdlib", "orjson", "direct"):
+        if name in results:
+            print(f"  {name:<17} {results[name]:8.1f} ms")
+    print(f"  serialization share (stdlib): "
+          f"{(results['stdlib'] - results['query_and_decode']) / results['stdlib']:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Parsing and validation for bulk survey imports
+
+Accepts either a JSON array of survey objects or NDJSON (one object per line)
+and validates every record with the SurveyResponse model, collecting per-row
+errors instead of failing the whole import.
+
+Bulk inserts drop the per-row insert triggers for the length of their INSERT
+and recreate them before committing; each index and counter is then updated
+with one set-based statement for the batch.
+"""
+
+from typing import Any, List, Tuple, Union
+
+from models import validate_survey
+from serialization import loads
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+def is_ndjson(text: Union[str, bytes], content_type: str = "") -> bool:
+    """Decide whether a payload is NDJSON from its content type, falling back to sniffing"""
+    if content_type:
+        media_type = content_type.split(";")[0].strip().lower()
+        if media_type in NDJSON_CONTENT_TYPES:
+            return True
+        if media_type == "application/json":
+            return False
+    return text.lstrip()[:1] not in ("[", b"[")
+
+def parse_records(text: Union[str, bytes], ndjson: bool) -> Tuple[List[Tuple[int, Any]], List[dict]]:
+    """Split a payload into (row number, record) pairs plus parse errors
+
+    Bytes are parsed without decoding the whole payload first; a line that is
+    not valid UTF-8 is reported like any other invalid JSON.
+    """
+    records, errors = [], []
+    if not ndjson:
+        try:
+            payload = loads(text)
+        except ValueError as e:
+            return [], [{"row": None, "error": f"Invalid JSON: {e}"}]
+        if not isinstance(payload, list):
+            return [], [{"row": None, "error": "Expected a JSON array of surveys"}]
+        return list(enumerate(payload, start=1)), []
+
+    for row, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            records.append((row, loads(line)))
+        except ValueError as e:
+            errors.append({"row": row, "error": f"Invalid JSON: {e}"})
+    return records, errors
+
+def validate_records(records: List[Tuple[int, Any]]) -> Tuple[List[dict], List[dict]]:
+    """Validate records with SurveyResponse, returning clean rows and per-row errors"""
+    rows, errors = [], []
+    for row, record in records:
+        if not isinstance(record, dict):
+            errors.append({"row": row, "error": "Expected a JSON object"})
+            continue
+        try:
+            rows.append(validate_survey(record))
+        except ValueError as e:
+            errors.append({"row": row, "error": str(e)})
+    return rows, errors
+
+def prepare_import(text: Union[str, bytes], ndjson: bool) -> Tuple[List[dict], List[dict]]:
+    """Parse and validate a bulk payload"""
+    records, parse_errors = parse_records(text, ndjson)
+    rows, validation_errors = validate_records(records)
+    errors = sorted(parse_errors + validation_errors, key=lambda e: e["row"] or 0)
+    return rows, errors
@@ -0,0 +1,86 @@
+"""
+Cross-tabulation of survey answers
+
+Each request is one grouped query, plus a single-pass count of respondents.
+Single-choice fields are grouped as stored, multi-select fields are exploded
+with json_each (a response counts once per chosen value), and filters are
+pushed into the WHERE clause. Field names are
+checked against the categorical and list field constants before they reach SQL;
+values are always bound parameters.
+"""
+
+import sqlite3
+
+from database import CATEGORICAL_FIELDS, LIST_FIELDS
+from serialization import dumps_text
+
+CROSSTAB_FIELDS = CATEGORICAL_FIELDS + LIST_FIELDS
+CROSSTAB_MAX_DIMENSIONS = 4
+
+def _list_source(field: str) -> str:
+    column = f"survey_responses.{field}"
+    return f"CASE WHEN json_valid({column}) AND json_type({column}) = 'array' THEN {column} ELSE '[]' END"
+
+def validate_crosstab(dimensions: list, filters: dict):
+    """Raise ValueError unless every dimension and filter names a groupable field"""
+    if not 2 <= len(dimensions) <= CROSSTAB_MAX_DIMENSIONS:
+        raise ValueError(f"Between 2 and {CROSSTAB_MAX_DIMENSIONS} dimensions are required")
+    if len(set(dimensions)) != len(dimensions):
+        raise ValueError("Dimensions must be distinct")
+    unknown = [field for field in list(dimensions) + list(filters) if field not in CROSSTAB_FIELDS]
+    if unknown:
+        raise ValueError(f"Fields cannot be cross-tabulated: {', '.join(dict.fromkeys(unknown))}")
+
+def _query_parts(dimensions: list, filters: dict) -> tuple:
+    """(value expressions, FROM clause, cell conditions, respondent conditions, parameters)
+
+    Respondents are counted without exploding the list fields: an EXISTS per
+    multi-select dimension replaces the join, so no DISTINCT is needed.
+    """
+    sources = ["survey_responses"]
+    columns = []
+    answered = []
+    respondent_answered = []
+    for index, field in enumerate(dimensions):
+        if field in LIST_FIELDS:
+            alias = f"d{index}"
+            sources.append(f"json_each({_list_source(field)}) AS {alias}")
+            columns.append(f"{alias}.value")
+            respondent_answered.append(f"EXISTS (SELECT 1 FROM json_each({_list_source(field)}) AS {alias} "
+                                       f"WHERE {alias}.value IS NOT NULL AND {alias}.value != '')")
+        else:
+            columns.append(f"survey_responses.{field}")
+            respondent_answered.append(f"{columns[-1]} IS NOT NULL AND {columns[-1]} != ''")
+        answered.append(f"{columns[-1]} IS NOT NULL AND {columns[-1]} != ''")
+
+    filtered = []
+    parameters = []
+    for field, values in filters.items():
+        # Values are passed as one JSON array parameter, so any number binds the same way
+        if field in LIST_FIELDS:
+            filtered.append(f"EXISTS (SELECT 1 FROM json_each({_list_source(field)}) AS f "
+                            f"WHERE f.value IN (SELECT value FROM json_each(?)))")
+        else:
+            filtered.append(f"survey_responses.{field} IN (SELECT value FROM json_each(?))")
+        parameters.append(dumps_text(list(values)))
+    return (columns, ", ".join(sources), " AND ".join(filtered + answered),
+            " AND ".join(filtered + respondent_answered), parameters)
+
+def compute_crosstab(conn: sqlite3.Connection, dimensions: list, filters: dict = None) -> dict:
+    """Response counts for every combination of values across the dimensions, largest first
+
+    A response is counted in every cell its answers fall into, so cells of a
+    multi-select dimension add up to more than `respondents` (responses that
+    match the filters and answered every dimension).
+    """
+    filters = {field: values for field, values in (filters or {}).items() if values}
+    validate_crosstab(dimensions, filters)
+    columns, sources, conditions, respondent_conditions, parameters = _query_parts(dimensions, filters)
+
+    groups = ", ".join(str(position) for position in range(1, len(columns) + 1))
+    cells = [{"values": list(row[:-1]), "count": row[-1]} for row in conn.execute(
+        f"SELECT {', '.join(columns)}, COUNT(*) FROM {sources} WHERE {conditions} "
+        f"GROUP BY {groups} ORDER BY {len(columns) + 1} DESC, {groups}", parameters)]
+    respondents = conn.execute(
+        f"SELECT COUNT(*) FROM survey_responses WHERE {respondent_conditions}", parameters).fetchone()[0]
+    return {"dimensions": list(dimensions), "filters": filters, "respondents": respondents, "cells": cells}
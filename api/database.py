@@ -0,0 +1,755 @@
+"""
+SQLite access layer for AI Navigator API
+
+One long-lived writer connection (serialized by a lock) and a bounded pool of
+read-only connections, all opened in WAL mode so readers never block the writer.
+Queries run on a dedicated thread pool so they never block the event loop.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import chain
+from operator import methodcaller
+
+from metrics import DB_QUERY_SECONDS
+from search import SEARCH_SCHEMA, index_search, rebuild_search
+from serialization import dumps, dumps_text, loads
+from terms import TERMS_SCHEMA, index_terms, rebuild_terms
+from trends import TRENDS_SCHEMA, add_trends, rebuild_trends
+
+# Database configuration
+DB_FILE = os.getenv("DB_FILE", "survey_responses.db")
+DB_READERS = int(os.getenv("DB_READERS", "4"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+# Executor threads for database work; 0 runs queries inline on the event loop
+DB_WORKERS = int(os.getenv("DB_WORKERS", str(DB_READERS + 1)))
+# Mirror multi-select answers into the normalized survey_choices table
+DB_NORMALIZED_CHOICES = os.getenv("DB_NORMALIZED_CHOICES", "0") == "1"
+
+# Columns stored as JSON encoded lists
+LIST_FIELDS = ['current_activity', 'known_ai_tools', 'ai_learning_method', 'ai_barriers']
+
+# Single-choice columns whose answers are counted per option
+CATEGORICAL_FIELDS = [
+    'age_group', 'self_definition', 'ai_usage_level', 'ai_experience',
+    'main_ai_goal', 'monthly_spending', 'community_interest',
+    'specific_ai_help', 'investment_willingness', 'platform_access',
+]
+
+# Insertable columns, in table order (everything except id and created_at)
+SURVEY_COLUMNS = [
+    'age_group', 'current_activity', 'self_definition', 'self_definition_other',
+    'known_ai_tools', 'ai_usage_level', 'ai_experience', 'ai_learning_method',
+    'ai_learning_method_other', 'main_ai_goal', 'main_ai_goal_other',
+    'biggest_ai_challenge', 'ai_creation_dream', 'future_ai_impact',
+    'monthly_spending', 'ai_barriers', 'barriers_other', 'community_interest',
+    'specific_ai_help', 'specific_ai_help_other', 'investment_willingness',
+    'platform_access', 'first_name', 'email', 'completion_time', 'ai_analysis',
+]
+
+# Every column, in table order (ai_analysis_version is appended by a migration)
+TABLE_COLUMNS = ["id"] + SURVEY_COLUMNS + ["created_at", "ai_analysis_version"]
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache can reuse the compiled form instead of re-preparing on every call.
+INSERT_SURVEY_SQL = (
+    f"INSERT INTO survey_responses ({', '.join(SURVEY_COLUMNS)}) "
+    f"VALUES ({', '.join(['?'] * len(SURVEY_COLUMNS))})"
+)
+# SELECT templates take a {columns} list, built only from whitelisted names
+SELECT_SURVEYS_SQL = """
+    SELECT {columns} FROM survey_responses
+    ORDER BY created_at DESC, id DESC
+    LIMIT ? OFFSET ?
+"""
+SELECT_SURVEYS_AFTER_SQL = """
+    SELECT {columns} FROM survey_responses
+    WHERE (created_at, id) < (?, ?)
+    ORDER BY created_at DESC, id DESC
+    LIMIT ?
+"""
+SELECT_SURVEY_SQL = "SELECT {columns} FROM survey_responses WHERE id = ?"
+UPDATE_ANALYSIS_SQL = "UPDATE survey_responses SET ai_analysis = ?, ai_analysis_version = ? WHERE id = ?"
+# Rows past an id whose analysis is missing, or (with a version) produced by another model/prompt
+SELECT_UNANALYZED_SQL = """
+    SELECT {columns} FROM survey_responses
+    WHERE id > ? AND (ai_analysis IS NULL OR ai_analysis = '' OR (? IS NOT NULL AND ai_analysis_version IS NOT ?))
+    ORDER BY id
+    LIMIT ?
+"""
+COUNT_UNANALYZED_SQL = """
+    SELECT COUNT(*) FROM survey_responses
+    WHERE id > ? AND (ai_analysis IS NULL OR ai_analysis = '' OR (? IS NOT NULL AND ai_analysis_version IS NOT ?))
+"""
+COUNT_SURVEYS_SQL = "SELECT value FROM survey_counters WHERE name = 'total'"
+COUNT_TODAY_SQL = "SELECT count FROM survey_daily_counts WHERE day = DATE('now')"
+TABLE_VERSION_SQL = "SELECT name, value FROM survey_counters WHERE name IN ('version', 'modified_at')"
+SELECT_OPTION_COUNTS_SQL = """
+    SELECT value, count FROM survey_option_counts
+    WHERE field = ? AND count > 0
+    ORDER BY count DESC
+"""
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS survey_responses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        age_group TEXT,
+        current_activity TEXT,
+        self_definition TEXT,
+        self_definition_other TEXT,
+        known_ai_tools TEXT,
+        ai_usage_level TEXT,
+        ai_experience TEXT,
+        ai_learning_method TEXT,
+        ai_learning_method_other TEXT,
+        main_ai_goal TEXT,
+        main_ai_goal_other TEXT,
+        biggest_ai_challenge TEXT,
+        ai_creation_dream TEXT,
+        future_ai_impact TEXT,
+        monthly_spending TEXT,
+        ai_barriers TEXT,
+        barriers_other TEXT,
+        community_interest TEXT,
+        specific_ai_help TEXT,
+        specific_ai_help_other TEXT,
+        investment_willingness TEXT,
+        platform_access TEXT,
+        first_name TEXT,
+        email TEXT,
+        completion_time INTEGER,
+        ai_analysis TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Keyset pagination over (created_at, id), newest first
+    CREATE INDEX IF NOT EXISTS idx_survey_responses_created_at
+        ON survey_responses (created_at DESC, id DESC);
+
+    -- Completion time percentiles for the dashboard aggregates
+    CREATE INDEX IF NOT EXISTS idx_survey_responses_completion_time
+        ON survey_responses (completion_time);
+"""
+
+def _option_count_statements(row: str, delta: str) -> str:
+    """Trigger body adjusting survey_option_counts for the OLD or NEW row"""
+    statements = []
+    for field in CATEGORICAL_FIELDS:
+        statements.append(f"""
+        INSERT INTO survey_option_counts (field, value, count)
+        SELECT '{field}', {row}.{field}, {delta}
+        WHERE {row}.{field} IS NOT NULL AND {row}.{field} != ''
+        ON CONFLICT (field, value) DO UPDATE SET count = count + excluded.count;""")
+    for field in LIST_FIELDS:
+        statements.append(f"""
+        INSERT INTO survey_option_counts (field, value, count)
+        SELECT '{field}', choice.value, {delta}
+        FROM json_each(CASE WHEN json_valid({row}.{field}) THEN {row}.{field} ELSE '[]' END) AS choice
+        WHERE choice.value IS NOT NULL AND choice.value != ''
+        ON CONFLICT (field, value) DO UPDATE SET count = count + excluded.count;""")
+    return "".join(statements)
+
+def _stats_statements(row: str, delta: str) -> str:
+    """Trigger body adjusting every statistics counter for the OLD or NEW row"""
+    return f"""
+        UPDATE survey_counters SET value = value + {delta} WHERE name = 'total';
+        INSERT INTO survey_daily_counts (day, count) VALUES (DATE({row}.created_at), {delta})
+        ON CONFLICT (day) DO UPDATE SET count = count + excluded.count;""" + _option_count_statements(row, delta)
+
+VERSION_BUMP_SQL = """
+        UPDATE survey_counters
+        SET value = CASE name WHEN 'version' THEN value + 1 ELSE CAST(strftime('%s', 'now') AS INTEGER) END
+        WHERE name IN ('version', 'modified_at');"""
+
+# Statistics kept up to date by triggers, in the same transaction as each
+# insert, so reads are primary key lookups instead of table scans.
+STATS_SCHEMA = f"""
+    -- Superseded by the survey_responses_stats_* triggers below
+    DROP TRIGGER IF EXISTS survey_responses_count_insert;
+    DROP TRIGGER IF EXISTS survey_responses_count_delete;
+    -- Superseded by the *_add triggers below, which bulk inserts skip
+    DROP TRIGGER IF EXISTS survey_responses_stats_insert;
+    DROP TRIGGER IF EXISTS survey_responses_version_insert;
+
+    CREATE TABLE IF NOT EXISTS survey_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS survey_daily_counts (
+        day TEXT PRIMARY KEY,
+        count INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS survey_option_counts (
+        field TEXT NOT NULL,
+        value TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (field, value)
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_stats_add
+    AFTER INSERT ON survey_responses BEGIN{_stats_statements("NEW", "1")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_stats_delete
+    AFTER DELETE ON survey_responses BEGIN{_stats_statements("OLD", "-1")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_stats_update
+    AFTER UPDATE OF {", ".join(CATEGORICAL_FIELDS + LIST_FIELDS)} ON survey_responses BEGIN{_option_count_statements("OLD", "-1")}{_option_count_statements("NEW", "1")}
+    END;
+    -- Table version for HTTP caching: bumped by every write, with the time of the last one
+    INSERT OR IGNORE INTO survey_counters (name, value) VALUES ('version', 0);
+    INSERT OR IGNORE INTO survey_counters (name, value) VALUES ('modified_at', CAST(strftime('%s', 'now') AS INTEGER));
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_version_add
+    AFTER INSERT ON survey_responses BEGIN{VERSION_BUMP_SQL}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_version_delete
+    AFTER DELETE ON survey_responses BEGIN{VERSION_BUMP_SQL}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_version_update
+    AFTER UPDATE ON survey_responses BEGIN{VERSION_BUMP_SQL}
+    END;
+"""
+
+def _choice_insert_statements(row: str) -> str:
+    """Trigger body copying the row's multi-select answers into survey_choices"""
+    return "".join(f"""
+        INSERT INTO survey_choices (survey_id, field, position, value)
+        SELECT {row}.id, '{field}', choice.key, choice.value
+        FROM json_each(CASE WHEN json_valid({row}.{field}) AND json_type({row}.{field}) = 'array'
+                            THEN {row}.{field} ELSE '[]' END) AS choice;""" for field in LIST_FIELDS)
+
+# Optional normalized copy of the multi-select columns: one row per chosen
+# value, so per-choice breakdowns and filters are index lookups.
+CHOICES_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS survey_choices (
+        survey_id INTEGER NOT NULL,
+        field TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        value TEXT,
+        PRIMARY KEY (survey_id, field, position)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_survey_choices_field_value
+        ON survey_choices (field, value, survey_id);
+
+    DROP TRIGGER IF EXISTS survey_responses_choices_insert;
+    CREATE TRIGGER IF NOT EXISTS survey_responses_choices_add
+    AFTER INSERT ON survey_responses BEGIN{_choice_insert_statements("NEW")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_choices_delete
+    AFTER DELETE ON survey_responses BEGIN
+        DELETE FROM survey_choices WHERE survey_id = OLD.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_choices_update
+    AFTER UPDATE OF {", ".join(LIST_FIELDS)} ON survey_responses BEGIN
+        DELETE FROM survey_choices WHERE survey_id = OLD.id;{_choice_insert_statements("NEW")}
+    END;
+"""
+DROP_CHOICES_TRIGGERS = """
+    DROP TRIGGER IF EXISTS survey_responses_choices_insert;
+    DROP TRIGGER IF EXISTS survey_responses_choices_add;
+    DROP TRIGGER IF EXISTS survey_responses_choices_delete;
+    DROP TRIGGER IF EXISTS survey_responses_choices_update;
+"""
+REBUILD_CHOICES_SQL = """
+    INSERT INTO survey_choices (survey_id, field, position, value)
+    SELECT survey_responses.id, '{field}', choice.key, choice.value
+    FROM survey_responses, json_each(survey_responses.{field}) AS choice
+    WHERE json_valid(survey_responses.{field}) AND json_type(survey_responses.{field}) = 'array'
+"""
+ADD_CHOICES_SQL = REBUILD_CHOICES_SQL + "    AND survey_responses.id BETWEEN ? AND ?\n"
+SELECT_CHOICES_SQL = """
+    SELECT survey_id, field, value FROM survey_choices
+    WHERE survey_id IN (SELECT value FROM json_each(?))
+    ORDER BY survey_id, field, position
+"""
+
+REBUILD_TOTAL_SQL = """
+    INSERT INTO survey_counters (name, value) SELECT 'total', COUNT(*) FROM survey_responses
+    WHERE true ON CONFLICT (name) DO UPDATE SET value = excluded.value
+"""
+COUNT_DAILY_SQL = """
+    SELECT DATE(created_at), COUNT(*) FROM survey_responses
+    WHERE created_at IS NOT NULL
+    GROUP BY DATE(created_at)
+"""
+REBUILD_DAILY_SQL = "INSERT INTO survey_daily_counts (day, count)" + COUNT_DAILY_SQL
+# Per-row insert triggers, which bulk_insert_surveys drops for the length of its INSERT
+SELECT_INSERT_TRIGGERS_SQL = """
+    SELECT name, sql FROM sqlite_master
+    WHERE type = 'trigger' AND tbl_name = 'survey_responses' AND sql LIKE '%AFTER INSERT ON survey_responses%'
+"""
+ADD_TOTAL_SQL = "UPDATE survey_counters SET value = value + ? WHERE name = 'total'"
+ADD_DAILY_SQL = """
+    INSERT INTO survey_daily_counts (day, count)
+    SELECT DATE(created_at), COUNT(*) FROM survey_responses
+    WHERE id BETWEEN ? AND ? AND created_at IS NOT NULL
+    GROUP BY DATE(created_at)
+    ON CONFLICT (day) DO UPDATE SET count = count + excluded.count
+"""
+ADD_OPTION_COUNT_SQL = """
+    INSERT INTO survey_option_counts (field, value, count) VALUES (?, ?, ?)
+    ON CONFLICT (field, value) DO UPDATE SET count = count + excluded.count
+"""
+# Field names below come from the constant lists above, never from clients
+COUNT_CATEGORICAL_SQL = """
+    SELECT {field}, COUNT(*) FROM survey_responses
+    WHERE {field} IS NOT NULL AND {field} != ''
+    GROUP BY {field}
+"""
+COUNT_LIST_SQL = """
+    SELECT choice.value, COUNT(*)
+    FROM survey_responses, json_each(survey_responses.{field}) AS choice
+    WHERE json_valid(survey_responses.{field}) AND choice.value IS NOT NULL AND choice.value != ''
+    GROUP BY choice.value
+"""
+
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+]
+
+def connect(path: str = DB_FILE, readonly: bool = False) -> sqlite3.Connection:
+    """Open a connection with the tuned pragmas applied"""
+    conn = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+def count_options(conn: sqlite3.Connection, field: str) -> dict:
+    """Recount answers for one categorical or list field with a full scan"""
+    sql = COUNT_LIST_SQL if field in LIST_FIELDS else COUNT_CATEGORICAL_SQL
+    return dict(conn.execute(sql.format(field=field)))
+
+def rebuild_stats(conn: sqlite3.Connection):
+    """Recompute every statistics counter from survey_responses (caller's transaction)"""
+    conn.execute("DELETE FROM survey_daily_counts")
+    conn.execute("DELETE FROM survey_option_counts")
+    conn.execute(REBUILD_TOTAL_SQL)
+    conn.execute(REBUILD_DAILY_SQL)
+    for field in CATEGORICAL_FIELDS + LIST_FIELDS:
+        conn.executemany(
+            "INSERT INTO survey_option_counts (field, value, count) VALUES (?, ?, ?)",
+            ((field, value, count) for value, count in count_options(conn, field).items()),
+        )
+
+def check_stats(conn: sqlite3.Connection) -> list:
+    """Compare stored counters with a fresh scan; returns a list of mismatches"""
+    mismatches = []
+
+    def compare(name, stored, actual):
+        for key in set(stored) | set(actual):
+            if stored.get(key, 0) != actual.get(key, 0):
+                mismatches.append({"counter": name, "key": key,
+                                   "stored": stored.get(key, 0), "actual": actual.get(key, 0)})
+
+    compare("total", {"total": count_surveys(conn)},
+            {"total": conn.execute("SELECT COUNT(*) FROM survey_responses").fetchone()[0]})
+    compare("daily", dict(conn.execute("SELECT day, count FROM survey_daily_counts")),
+            dict(conn.execute(COUNT_DAILY_SQL)))
+    for field in CATEGORICAL_FIELDS + LIST_FIELDS:
+        stored = dict(conn.execute("SELECT value, count FROM survey_option_counts WHERE field = ?", (field,)))
+        compare(field, stored, count_options(conn, field))
+    return mismatches
+
+def rebuild_choices(conn: sqlite3.Connection):
+    """Repopulate survey_choices from the JSON list columns (caller's transaction)"""
+    conn.execute("DELETE FROM survey_choices")
+    for field in LIST_FIELDS:
+        conn.execute(REBUILD_CHOICES_SQL.format(field=field))
+
+def choices_active(conn: sqlite3.Connection) -> bool:
+    """Whether survey_choices is being kept in sync with survey_responses"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'survey_responses_choices_add'"
+    ).fetchone() is not None
+
+def sync_choices(conn: sqlite3.Connection, enabled: bool = DB_NORMALIZED_CHOICES):
+    """Create or drop the survey_choices triggers, backfilling when newly enabled"""
+    active = choices_active(conn)
+    if enabled and not active:
+        conn.executescript(CHOICES_SCHEMA)
+        with conn:
+            rebuild_choices(conn)
+    elif not enabled and active:
+        # The table is left in place but goes stale; re-enabling rebuilds it
+        conn.executescript(DROP_CHOICES_TRIGGERS)
+
+def add_analysis_version(conn: sqlite3.Connection):
+    """Record which model + system prompt produced each stored analysis"""
+    conn.execute("ALTER TABLE survey_responses ADD COLUMN ai_analysis_version TEXT")
+
+# WHEN clause the insert triggers had while bulk loads flagged themselves in survey_counters
+_BULK_LOAD_GUARD = "WHEN (SELECT value FROM survey_counters WHERE name = 'bulk_load') IS NOT 1"
+
+def drop_bulk_load_guard(conn: sqlite3.Connection):
+    """Recreate insert triggers without the per-row bulk_load lookup"""
+    conn.execute("DELETE FROM survey_counters WHERE name = 'bulk_load'")
+    for name, sql in conn.execute(SELECT_INSERT_TRIGGERS_SQL).fetchall():
+        if _BULK_LOAD_GUARD in sql:
+            conn.execute(f"DROP TRIGGER {name}")
+            conn.execute(sql.replace(f" {_BULK_LOAD_GUARD}", ""))
+
+# Schema migrations, applied in order; the list index + 1 is PRAGMA user_version
+MIGRATIONS = [
+    rebuild_stats,
+    add_analysis_version,
+    rebuild_terms,
+    rebuild_search,
+    rebuild_trends,
+    drop_bulk_load_guard,
+]
+
+def init_db(path: str = DB_FILE):
+    """Initialize SQLite database with survey_responses table"""
+    conn = connect(path)
+    conn.executescript(SCHEMA)
+    conn.executescript(STATS_SCHEMA)
+    conn.executescript(TERMS_SCHEMA)
+    conn.executescript(SEARCH_SCHEMA)
+    conn.executescript(TRENDS_SCHEMA)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, migration in enumerate(MIGRATIONS, start=1):
+        if version < target:
+            with conn:
+                migration(conn)
+                conn.execute(f"PRAGMA user_version = {target}")
+    sync_choices(conn)
+    conn.close()
+
+_LIST_COLUMN_INDEXES = [index for index, column in enumerate(SURVEY_COLUMNS) if column in LIST_FIELDS]
+
+def encode_survey(data: dict) -> list:
+    """Convert a survey dict to INSERT parameters, JSON encoding list fields"""
+    values = list(map(data.get, SURVEY_COLUMNS))
+    for index in _LIST_COLUMN_INDEXES:
+        if isinstance(values[index], list):
+            values[index] = dumps_text(values[index])
+    return values
+
+def decode_survey_row(columns: list, row: tuple) -> dict:
+    """Convert a survey_responses row to a dict, decoding JSON list fields"""
+    survey = dict(zip(columns, row))
+    for field in LIST_FIELDS:
+        if survey.get(field):
+            try:
+                survey[field] = loads(survey[field])
+            except ValueError:
+                pass
+    return survey
+
+def insert_survey(conn: sqlite3.Connection, data: dict) -> int:
+    """Insert one survey response and return its id"""
+    survey_id = conn.execute(INSERT_SURVEY_SQL, encode_survey(data)).lastrowid
+    index_terms(conn, survey_id, [data])
+    return survey_id
+
+def insert_surveys(conn: sqlite3.Connection, rows: list) -> list:
+    """Insert several survey responses in the caller's transaction, returning their ids"""
+    ids = [conn.execute(INSERT_SURVEY_SQL, encode_survey(data)).lastrowid for data in rows]
+    if ids:
+        index_terms(conn, ids[0], rows)
+    return ids
+
+def count_new_options(rows: list) -> Counter:
+    """(field, value) answer counts for survey dicts, as the stats trigger counts them"""
+    counts = Counter()
+    for field in CATEGORICAL_FIELDS:
+        answers = Counter(map(methodcaller("get", field), rows))
+        counts.update({(field, value): count for value, count in answers.items() if value})
+    for field in LIST_FIELDS:
+        # Validated rows hold a list or None for these fields
+        answers = Counter(chain.from_iterable(filter(None, map(methodcaller("get", field), rows))))
+        counts.update({(field, value): count for value, count in answers.items() if value})
+    return counts
+
+def bulk_insert_surveys(conn: sqlite3.Connection, rows: list) -> dict:
+    """Insert many survey responses with executemany in the caller's transaction
+
+    The per-row insert triggers are dropped for the INSERT; counters, rollups
+    and indexes get one set-based update for the whole batch instead.
+    """
+    if not rows:
+        return {"inserted": 0, "first_id": None, "last_id": None}
+    # DDL is transactional: the triggers are back before commit, so no other
+    # connection ever sees them missing
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    triggers = conn.execute(SELECT_INSERT_TRIGGERS_SQL).fetchall()
+    for name, _ in triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+    try:
+        conn.executemany(INSERT_SURVEY_SQL, (encode_survey(data) for data in rows))
+    finally:
+        for _, sql in triggers:
+            conn.execute(sql)
+    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    # The writer lock serializes inserts, so the new ids are contiguous
+    first_id = last_id - len(rows) + 1
+
+    conn.execute(ADD_TOTAL_SQL, (len(rows),))
+    conn.execute(ADD_DAILY_SQL, (first_id, last_id))
+    conn.executemany(ADD_OPTION_COUNT_SQL, ((field, value, count)
+                                            for (field, value), count in count_new_options(rows).items()))
+    add_trends(conn, first_id, last_id)
+    index_search(conn, first_id, last_id)
+    index_terms(conn, first_id, rows)
+    if choices_active(conn):
+        for field in LIST_FIELDS:
+            conn.execute(ADD_CHOICES_SQL.format(field=field), (first_id, last_id))
+    conn.execute(VERSION_BUMP_SQL)
+    return {"inserted": len(rows), "first_id": first_id, "last_id": last_id}
+
+def update_survey_analysis(conn: sqlite3.Connection, survey_id: int, analysis: str,
+                           version: str = None) -> bool:
+    """Store the AI analysis for one survey; returns False if the survey does not exist"""
+    return conn.execute(UPDATE_ANALYSIS_SQL, (analysis, version, survey_id)).rowcount > 0
+
+def update_survey_analyses(conn: sqlite3.Connection, results: list) -> int:
+    """Store many (survey_id, analysis, version) results in the caller's transaction"""
+    cursor = conn.executemany(UPDATE_ANALYSIS_SQL, ((analysis, version, survey_id)
+                                                    for survey_id, analysis, version in results))
+    return cursor.rowcount
+
+def fetch_unanalyzed(conn: sqlite3.Connection, after_id: int, limit: int, stale_version: str = None) -> list:
+    """Surveys with id > after_id lacking an analysis, oldest first
+
+    With stale_version, analyses stored under any other version are included too.
+    """
+    cursor = conn.execute(SELECT_UNANALYZED_SQL.format(columns=columns_sql()),
+                          (after_id, stale_version, stale_version, limit))
+    return _decode_rows(conn, cursor)
+
+def count_unanalyzed(conn: sqlite3.Connection, after_id: int = 0, stale_version: str = None) -> int:
+    """Number of surveys fetch_unanalyzed would still return"""
+    return conn.execute(COUNT_UNANALYZED_SQL, (after_id, stale_version, stale_version)).fetchone()[0]
+
+def projection(fields: list = None) -> list:
+    """Column names for a projection; id and created_at are always included"""
+    if not fields:
+        return TABLE_COLUMNS
+    unknown = set(fields) - set(SURVEY_COLUMNS) - {"id", "created_at"}
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    extra = [field for field in fields if field not in ("id", "created_at")]
+    return ["id", "created_at"] + list(dict.fromkeys(extra))
+
+def columns_sql(fields: list = None) -> str:
+    """SQL column list for a projection; id and created_at are always included"""
+    if not fields and not DB_NORMALIZED_CHOICES:
+        return "*"
+    columns = projection(fields)
+    if DB_NORMALIZED_CHOICES:
+        # List values come from survey_choices; only read whether they are set
+        columns = [f"({column} IS NOT NULL) AS {column}" if column in LIST_FIELDS else column
+                   for column in columns]
+    return ", ".join(columns)
+
+def fetch_choices(conn: sqlite3.Connection, survey_ids: list) -> dict:
+    """Multi-select answers for several surveys, keyed by (survey_id, field)"""
+    choices = {}
+    for survey_id, field, value in conn.execute(SELECT_CHOICES_SQL, (json.dumps(survey_ids),)):
+        choices.setdefault((survey_id, field), []).append(value)
+    return choices
+
+def _decode_rows(conn: sqlite3.Connection, cursor: sqlite3.Cursor) -> list:
+    """Decode a result set, reassembling list fields from JSON or survey_choices"""
+    columns = [description[0] for description in cursor.description]
+    if not DB_NORMALIZED_CHOICES:
+        return [decode_survey_row(columns, row) for row in cursor]
+
+    surveys = [dict(zip(columns, row)) for row in cursor]
+    list_fields = [column for column in columns if column in LIST_FIELDS]
+    if surveys and list_fields:
+        choices = fetch_choices(conn, [survey["id"] for survey in surveys])
+        for survey in surveys:
+            for field in list_fields:
+                survey[field] = choices.get((survey["id"], field), []) if survey[field] else None
+    return surveys
+
+def encode_cursor(survey: dict) -> str:
+    """Opaque pagination token pointing just past the given survey"""
+    raw = json.dumps([survey["created_at"], survey["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> tuple:
+    """Decode a pagination token into (created_at, id); raises ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, survey_id = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(created_at, str) or not isinstance(survey_id, int):
+        raise ValueError("Invalid pagination cursor")
+    return created_at, survey_id
+
+def count_surveys(conn: sqlite3.Connection) -> int:
+    """Total number of responses, read from the trigger-maintained counter"""
+    row = conn.execute(COUNT_SURVEYS_SQL).fetchone()
+    return row[0] if row else 0
+
+def fetch_surveys(conn: sqlite3.Connection, limit: int, offset: int = 0, after: tuple = None,
+                  fields: list = None) -> dict:
+    """Fetch a page of survey responses, newest first, with the total and next cursor"""
+    columns = columns_sql(fields)
+    if after:
+        cursor = conn.execute(SELECT_SURVEYS_AFTER_SQL.format(columns=columns), (*after, limit))
+    else:
+        cursor = conn.execute(SELECT_SURVEYS_SQL.format(columns=columns), (limit, offset))
+    surveys = _decode_rows(conn, cursor)
+    next_cursor = encode_cursor(surveys[-1]) if surveys and len(surveys) == limit else None
+    return {"surveys": surveys, "total": count_surveys(conn), "next_cursor": next_cursor}
+
+def json_object_sql(columns: list) -> str:
+    """SQL building each row as a JSON object; valid list columns are embedded as arrays"""
+    pairs = []
+    for column in columns:
+        value = f"iif(json_valid({column}), json({column}), {column})" if column in LIST_FIELDS else column
+        pairs.append(f"'{column}', {value}")
+    return f"json_object({', '.join(pairs)})"
+
+def fetch_surveys_json(conn: sqlite3.Connection, limit: int, offset: int = 0, after: tuple = None,
+                       fields: list = None) -> bytes:
+    """fetch_surveys() encoded straight to JSON bytes
+
+    SQLite renders every row with json_object and the stored list JSON is spliced
+    in as is, so no per-row dict is built or decoded in Python.
+    """
+    if DB_NORMALIZED_CHOICES:
+        # List values live in survey_choices; reassemble them the regular way
+        return dumps(fetch_surveys(conn, limit, offset, after, fields))
+    columns = f"{json_object_sql(projection(fields))}, created_at, id"
+    if after:
+        rows = conn.execute(SELECT_SURVEYS_AFTER_SQL.format(columns=columns), (*after, limit)).fetchall()
+    else:
+        rows = conn.execute(SELECT_SURVEYS_SQL.format(columns=columns), (limit, offset)).fetchall()
+    next_cursor = None
+    if rows and len(rows) == limit:
+        next_cursor = encode_cursor({"created_at": rows[-1][1], "id": rows[-1][2]})
+    return b"".join([
+        b'{"surveys":[', ",".join(row[0] for row in rows).encode("utf-8"),
+        b'],"total":', str(count_surveys(conn)).encode(),
+        b',"next_cursor":', dumps(next_cursor), b"}",
+    ])
+
+def fetch_survey(conn: sqlite3.Connection, survey_id: int, fields: list = None):
+    """Fetch a single survey response, or None if it does not exist"""
+    cursor = conn.execute(SELECT_SURVEY_SQL.format(columns=columns_sql(fields)), (survey_id,))
+    surveys = _decode_rows(conn, cursor)
+    return surveys[0] if surveys else None
+
+def fetch_stats(conn: sqlite3.Connection) -> dict:
+    """Count all responses and today's responses from the maintained counters"""
+    total = count_surveys(conn)
+    row = conn.execute(COUNT_TODAY_SQL).fetchone()
+    return {"total": total, "today": row[0] if row else 0}
+
+def fetch_table_version(conn: sqlite3.Connection) -> tuple:
+    """(version, modified_at): a counter bumped by every write and the Unix time of the last one"""
+    counters = dict(conn.execute(TABLE_VERSION_SQL))
+    return counters.get("version", 0), counters.get("modified_at", 0)
+
+def fetch_option_counts(conn: sqlite3.Connection, field: str) -> list:
+    """Maintained per-option counts for one field, most common first"""
+    return conn.execute(SELECT_OPTION_COUNTS_SQL, (field,)).fetchall()
+
+class ConnectionPool:
+    """One shared writer connection plus a bounded pool of reader connections"""
+
+    def __init__(self, path: str = DB_FILE, readers: int = DB_READERS, timeout: float = DB_POOL_TIMEOUT,
+                 workers: int = DB_WORKERS):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db") if workers > 0 else None
+        self._write_lock = threading.Lock()
+        self._writer = connect(path)
+        self._readers = queue.LifoQueue(maxsize=max(readers, 1))
+        for _ in range(max(readers, 1)):
+            self._readers.put(connect(path, readonly=True))
+        self._closed = False
+
+    @contextmanager
+    def writer(self):
+        """Exclusive access to the writer connection, committed on success"""
+        if not self._write_lock.acquire(timeout=self.timeout):
+            raise TimeoutError("Timed out waiting for the database writer")
+        try:
+            with self._writer:
+                yield self._writer
+        finally:
+            self._write_lock.release()
+
+    @contextmanager
+    def reader(self):
+        """Borrow a read-only connection from the pool"""
+        try:
+            conn = self._readers.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError("Timed out waiting for a database reader")
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    async def read(self, fn, *args):
+        """Run fn(conn, *args) on a reader connection off the event loop"""
+        return await self._run(self.reader, fn, args, "read")
+
+    async def write(self, fn, *args):
+        """Run fn(conn, *args) in a write transaction off the event loop"""
+        return await self._run(self.writer, fn, args, "write")
+
+    async def _run(self, acquire, fn, args, kind):
+        operation = getattr(fn, "__name__", "query")
+
+        def call():
+            # Timed from when a connection is held through commit, so pool waits don't count
+            started = None
+            try:
+                with acquire() as conn:
+                    started = time.perf_counter()
+                    return fn(conn, *args)
+            finally:
+                if started is not None:
+                    DB_QUERY_SECONDS.observe(time.perf_counter() - started, self.name, kind, operation)
+
+        if self._executor is None:
+            return call()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, call)
+
+    def close(self):
+        """Close every pooled connection"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        with self._write_lock:
+            self._writer.close()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,63 @@
+"""
+Streaming export of survey responses as NDJSON or CSV
+
+Rows are read with fetchmany from a dedicated read-only connection and encoded
+chunk by chunk, so memory use stays flat regardless of table size.
+"""
+
+import csv
+import io
+
+from database import LIST_FIELDS, connect, decode_survey_row
+from serialization import dumps
+
+EXPORT_SQL = "SELECT * FROM survey_responses ORDER BY id"
+EXPORT_CHUNK_ROWS = 500
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _iter_rows(path: str, chunk_rows: int):
+    """Yield the column names, then chunks of decoded rows from a server-side cursor"""
+    conn = connect(path, readonly=True)
+    try:
+        cursor = conn.execute(EXPORT_SQL)
+        columns = [description[0] for description in cursor.description]
+        yield columns
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield [decode_survey_row(columns, row) for row in rows]
+    finally:
+        conn.close()
+
+def iter_ndjson(path: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Yield the whole table as NDJSON, one encoded chunk at a time"""
+    rows = _iter_rows(path, chunk_rows)
+    next(rows)
+    for surveys in rows:
+        yield b"".join(dumps(survey) + b"\n" for survey in surveys)
+
+def iter_csv(path: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Yield the whole table as CSV; list fields are joined with '; '"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows = _iter_rows(path, chunk_rows)
+    columns = next(rows)
+    # BOM so spreadsheet apps detect UTF-8 and render Hebrew correctly
+    buffer.write("\ufeff")
+    writer.writerow(columns)
+    for surveys in rows:
+        for survey in surveys:
+            for field in LIST_FIELDS:
+                if isinstance(survey.get(field), list):
+                    survey[field] = "; ".join(survey[field])
+            writer.writerow([survey[column] for column in columns])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,89 @@
+"""
+Conditional GET support and an in-process cache of serialized response bodies
+
+Bodies are cached per request key together with the table version they were
+built from, so a hit costs one primary key lookup of the version counter. ETags
+are a hash of the body, which keeps them valid across restarts and counter
+resets; Last-Modified is the time of the last write to survey_responses.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from serialization import dumps
+
+# Cache configuration
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+def encode_body(data) -> bytes:
+    """Serialize a response body; already encoded bytes pass through"""
+    return data if isinstance(data, bytes) else dumps(data)
+
+def body_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+class ResponseCache:
+    """Byte-bounded LRU of (validity, etag, body) entries"""
+
+    def __init__(self, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (validity, etag, body)
+
+    def get(self, key: Hashable, validity: Hashable) -> Optional[Tuple[str, bytes]]:
+        """The cached (etag, body) for key if it was built for this validity"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != validity:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def set(self, key: Hashable, validity: Hashable, body: bytes) -> Tuple[str, bytes]:
+        """Store a serialized body and return its (etag, body)"""
+        etag = body_etag(body)
+        if len(body) > self.max_bytes:
+            return etag, body
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old[2])
+        self._entries[key] = (validity, etag, body)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+        return etag, body
+
+def is_not_modified(request: Request, etag: str, modified_at: int) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against a representation"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return modified_at <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def cached_response(request: Request, etag: str, body: bytes, modified_at: int) -> Response:
+    """200 with the body, or 304 if the client's copy is current; both carry validators"""
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(modified_at, usegmt=True),
+        # Clients may store the body but must revalidate before reusing it
+        "Cache-Control": "no-cache",
+    }
+    if is_not_modified(request, etag, modified_at):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
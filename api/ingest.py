@@ -0,0 +1,92 @@
+"""
+Group-commit ingestion for survey submissions
+
+Submissions are queued in memory and a background task writes them in batched
+transactions, so many inserts share a single commit. Each caller still waits
+for its own row id, which is only returned once its batch has committed.
+"""
+
+import asyncio
+import os
+import time
+
+from database import ConnectionPool, insert_survey, insert_surveys
+
+# Ingestion configuration
+INGEST_MODE = os.getenv("INGEST_MODE", "direct")  # "direct" or "batch"
+INGEST_MAX_BATCH = int(os.getenv("INGEST_MAX_BATCH", "500"))
+INGEST_MAX_DELAY_MS = float(os.getenv("INGEST_MAX_DELAY_MS", "5"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "10000"))
+
+class BatchWriter:
+    """Background task that flushes queued submissions in batched transactions"""
+
+    def __init__(self, pool: ConnectionPool, max_batch: int = INGEST_MAX_BATCH,
+                 max_delay_ms: float = INGEST_MAX_DELAY_MS, queue_size: int = INGEST_QUEUE_SIZE):
+        self.pool = pool
+        self.max_batch = max(max_batch, 1)
+        self.max_delay = max_delay_ms / 1000
+        self.queue_size = queue_size
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        """Start the flush loop on the running event loop"""
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued, then stop the flush loop"""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, data: dict) -> int:
+        """Queue one survey and wait until its batch commits; returns the row id"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((data, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: list):
+        try:
+            ids = await self.pool.write(insert_surveys, [data for data, _ in batch])
+        except Exception:
+            # One bad row must not fail the whole batch: retry rows one by one
+            for data, future in batch:
+                try:
+                    survey_id = await self.pool.write(insert_survey, data)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(survey_id)
+            return
+        for (_, future), survey_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(survey_id)
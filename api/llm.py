@@ -0,0 +1,433 @@
+"""
+OpenRouter client and request scheduling for AI analyses
+
+Every upstream call goes through LLMScheduler, which caps concurrent calls,
+keeps a bounded wait queue with a deadline, rate limits with a token bucket and
+retries 429/5xx/connection errors with jittered exponential backoff. Callers
+that cannot be admitted in time get SchedulerBusy so the API can answer 503
+with Retry-After instead of hanging.
+
+A circuit breaker in front of the scheduler opens after consecutive upstream
+failures or latency-SLO breaches; while open, calls raise CircuitOpen at once so
+the API can serve its fallback instead of waiting out the client timeout.
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import random
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+import openai
+from openai import AsyncOpenAI
+
+from metrics import LLM_CALL_SECONDS, LLM_CALLS, record_tokens
+
+T = TypeVar("T")
+
+# OpenRouter configuration
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "microsoft/phi-3-mini-128k-instruct:free")
+OPENROUTER_TIMEOUT = float(os.getenv("OPENROUTER_TIMEOUT", "60"))
+
+# Scheduler configuration
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "4"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "100"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+LLM_RATE_PER_MINUTE = float(os.getenv("LLM_RATE_PER_MINUTE", "20"))
+LLM_RATE_BURST = int(os.getenv("LLM_RATE_BURST", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+
+# Circuit breaker configuration
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_LATENCY_SLO = float(os.getenv("LLM_BREAKER_LATENCY_SLO", "20"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+LLM_BREAKER_PROBES = int(os.getenv("LLM_BREAKER_PROBES", "1"))
+
+# Initialize OpenAI client for OpenRouter; retries are owned by the scheduler
+openai_client = AsyncOpenAI(
+    base_url=OPENROUTER_BASE_URL,
+    api_key=OPENROUTER_API_KEY,
+    timeout=OPENROUTER_TIMEOUT,
+    max_retries=0,
+) if OPENROUTER_API_KEY else None
+
+# Enhanced system prompt for better Hebrew analysis
+ANALYSIS_SYSTEM_PROMPT = """
+אתה מומחה AI שמסייע לאנשים בישראל להבין ולהתחיל להשתמש בטכנולוגיות בינה מלאכותית.
+המטרה שלך היא לנתח תשובות שאלון ולתת המלצות מותאמות אישית בעברית.
+
+הנחיות לניתוח:
+1. כתוב בעברית בטון חם, מעודד ומקצועי
+2. תן המלצות ספציפיות ומעשיות
+3. התמקד בכלי AI חינמיים ונגישים
+4. הצע נתיב למידה הדרגתי
+5. כלול רעיון לפרויקט ראשון מותאם אישית
+6. השתמש באמוג'י להפיכת התוכן לחזותי יותר
+
+מבנה הניתוח:
+🎯 פרופיל אישי (2-3 שורות)
+🚀 המלצות לכלי AI (3 כלים ספציפיים)
+📚 נתיב למידה מומלץ (3-4 צעדים)
+💡 רעיון לפרויקט ראשון
+✨ עידוד לסיום
+
+אורך: כ-250 מילים.
+"""
+
+# Identifies the model + system prompt behind a stored analysis, so analyses
+# produced before either changed can be found and regenerated
+ANALYSIS_VERSION = hashlib.sha256(
+    f"{OPENROUTER_MODEL}\n{ANALYSIS_SYSTEM_PROMPT}".encode("utf-8")
+).hexdigest()[:16]
+
+def _joined(values) -> str:
+    return ", ".join(values) if isinstance(values, list) else (values or "")
+
+def _other(value: str, other: str) -> str:
+    """Append the free-text detail when 'אחר' (other) was chosen"""
+    chosen = "אחר" in value if isinstance(value, list) else value == "אחר"
+    return f" (פירוט: {other or ''})" if chosen else ""
+
+def build_analysis_prompt(survey: dict) -> str:
+    """Analysis prompt for a stored survey row, matching the one the survey page sends"""
+    return f"""
+נתח את התשובות הבאות של משתמש בשאלון על שימוש ב-AI ותן המלצות מותאמות אישית:
+
+גיל: {survey.get('age_group') or ''}
+עיסוק: {_joined(survey.get('current_activity'))}
+הגדרה עצמית: {survey.get('self_definition') or ''}{_other(survey.get('self_definition'), survey.get('self_definition_other'))}
+כלים מוכרים: {_joined(survey.get('known_ai_tools'))}
+רמת שימוש: {survey.get('ai_usage_level') or ''}
+ניסיון קודם: {survey.get('ai_experience') or ''}
+דרך למידה מועדפת: {_joined(survey.get('ai_learning_method'))}{_other(survey.get('ai_learning_method'), survey.get('ai_learning_method_other'))}
+מטרה עיקרית בשימוש ב-AI: {survey.get('main_ai_goal') or ''}{_other(survey.get('main_ai_goal'), survey.get('main_ai_goal_other'))}
+הוצאה חודשית על כלים: {survey.get('monthly_spending') or ''}
+מחסומים ידועים: {_joined(survey.get('ai_barriers'))}{_other(survey.get('ai_barriers'), survey.get('barriers_other'))}
+האתגר הגדול ביותר: {survey.get('biggest_ai_challenge') or ''}
+חלום יצירה עם AI: {survey.get('ai_creation_dream') or ''}
+השפעה רצויה על החיים: {survey.get('future_ai_impact') or ''}
+עניין בקהילה: {survey.get('community_interest') or ''}
+עזרה ספציפית נדרשת: {survey.get('specific_ai_help') or ''}{_other(survey.get('specific_ai_help'), survey.get('specific_ai_help_other'))}
+נכונות להשקעה חודשית: {survey.get('investment_willingness') or ''}
+
+בהתבסס על כל המידע הזה, כתוב ניתוח מותאם אישית עם:
+1. פרופיל אישיותי קצר המבוסס על הגדרה עצמית, מטרות ואתגרים.
+2. המלצות ספציפיות ל-2-3 כלי AI שמתאימים למטרות ולניסיון שלו.
+3. נתיב למידה מותאם אישית המבוסס על דרך הלמידה המועדפת עליו והעזרה הספציפית שביקש.
+4. רעיון לפרויקט אישי שמתחבר לחלומות, לשאיפות ולאתגרים שהציג.
+
+כתוב בעברית, בטון חם, מעודד ומקצועי, באורך של כ-250 מילים.
+""".strip()
+
+class SchedulerBusy(Exception):
+    """Raised when a call cannot be admitted before its queue deadline"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, deadline: float):
+        """Take one token, waiting for refill; raises SchedulerBusy if that would pass the deadline
+
+        The token is reserved before sleeping, so the balance can go negative and
+        later callers see the full wait ahead of them instead of queueing on a lock.
+        """
+        if self.rate <= 0:
+            return
+        self._refill()
+        wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0
+        if time.monotonic() + wait > deadline:
+            raise SchedulerBusy("LLM rate limit reached", retry_after=wait)
+        self._tokens -= 1
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._tokens += 1
+                raise
+
+class CircuitOpen(Exception):
+    """Raised instead of calling upstream while the circuit breaker is open"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+class CircuitBreaker:
+    """Closed -> open after `failures` bad calls in a row -> half-open probes after `cooldown`
+
+    A call is bad if it fails upstream or succeeds slower than `latency_slo` seconds.
+    """
+
+    def __init__(self, failures: int = LLM_BREAKER_FAILURES, latency_slo: float = LLM_BREAKER_LATENCY_SLO,
+                 cooldown: float = LLM_BREAKER_COOLDOWN, probes: int = LLM_BREAKER_PROBES):
+        self.failure_threshold = max(failures, 1)
+        self.latency_slo = latency_slo
+        self.cooldown = cooldown
+        self.max_probes = max(probes, 1)
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self.short_circuited = 0
+        self._probes = 0
+        self._round = 0  # numbers each half-open period, so late probes from an earlier one are ignored
+
+    def check(self):
+        """Raise CircuitOpen while open; cheap enough to call before queueing"""
+        if self.state == "open":
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                self.short_circuited += 1
+                raise CircuitOpen("LLM circuit breaker is open", retry_after=remaining)
+            self.state = "half_open"
+            self._probes = 0
+            self._round += 1
+
+    def acquire(self) -> Optional[int]:
+        """Admit one upstream attempt; in half-open only `probes` attempts run at a time
+
+        Returns a probe token for half-open attempts (None otherwise), to be passed
+        back to release() or record().
+        """
+        self.check()
+        if self.state != "half_open":
+            return None
+        if self._probes >= self.max_probes:
+            self.short_circuited += 1
+            raise CircuitOpen("LLM circuit breaker is probing", retry_after=1)
+        self._probes += 1
+        return self._round
+
+    def release(self, probe: Optional[int] = None):
+        """Give back an attempt admitted by acquire() that never completed"""
+        if probe is not None and probe == self._round and self.state == "half_open":
+            self._probes = max(0, self._probes - 1)
+
+    def record(self, ok: Optional[bool], latency: float = 0, probe: Optional[int] = None):
+        """Report the outcome of an attempt admitted by acquire()
+
+        ok=None is neutral (the request itself was bad): it frees the probe slot
+        without counting for or against upstream health. Once the breaker has
+        opened, only the current half-open probes decide its state; calls admitted
+        earlier finish without effect.
+        """
+        self.release(probe)
+        if ok is None or self.state == "open" or (self.state == "half_open" and probe != self._round):
+            return
+        if ok and latency <= self.latency_slo:
+            self.consecutive_failures = 0
+            self.state = "closed"
+            return
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.trips += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """Breaker state for /health"""
+        snapshot = {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "short_circuited": self.short_circuited,
+        }
+        if self.state == "open":
+            snapshot["retry_in"] = round(max(0, self.opened_at + self.cooldown - time.monotonic()), 1)
+        return snapshot
+
+def is_retryable(error: Exception) -> bool:
+    """429s, 5xx responses, timeouts and connection failures are worth retrying"""
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (openai.APIConnectionError, openai.APITimeoutError))
+
+def is_upstream_failure(error: Exception) -> bool:
+    """Errors that say OpenRouter is unhealthy, as opposed to a bad request"""
+    if isinstance(error, openai.APIStatusError) and error.status_code in (401, 403):
+        return True
+    return is_retryable(error)
+
+def _retry_after_header(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+class LLMScheduler:
+    """Admission control for upstream LLM calls"""
+
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT, max_queue: int = LLM_MAX_QUEUE,
+                 queue_timeout: float = LLM_QUEUE_TIMEOUT, rate_per_minute: float = LLM_RATE_PER_MINUTE,
+                 burst: int = LLM_RATE_BURST, max_retries: int = LLM_MAX_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE, backoff_max: float = LLM_BACKOFF_MAX,
+                 breaker: CircuitBreaker = None):
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = TokenBucket(rate_per_minute / 60, burst)
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = None  # created on first use, inside the running loop
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.retries = 0
+
+    @property
+    def saturated(self) -> bool:
+        """True when a new call would have to queue"""
+        return self.in_flight >= self.max_in_flight
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Run call() once admitted, retrying transient upstream failures"""
+        self.breaker.check()
+        deadline = time.monotonic() + self.queue_timeout
+        await self._admit(deadline)
+        try:
+            return await self._call_with_retries(call, deadline)
+        finally:
+            self._release()
+
+    async def stream(self, call: Callable[[], Awaitable[AsyncIterator[T]]]) -> AsyncIterator[T]:
+        """Open a streaming call once admitted and yield its chunks, holding the slot throughout
+
+        Only opening the stream is retried; a failure mid-stream is raised to the caller.
+        """
+        self.breaker.check()
+        deadline = time.monotonic() + self.queue_timeout
+        await self._admit(deadline)
+        try:
+            upstream = await self._call_with_retries(call, deadline)
+            try:
+                async for chunk in upstream:
+                    yield chunk
+            finally:
+                close = getattr(upstream, "close", None)
+                if close is not None:
+                    await close()
+        finally:
+            self._release()
+
+    async def _call_with_retries(self, call: Callable[[], Awaitable[T]], deadline: float) -> T:
+        attempt = 0
+        while True:
+            try:
+                await self.bucket.acquire(deadline if attempt == 0 else math.inf)
+            except SchedulerBusy:
+                self.rejected += 1
+                raise
+            probe = self.breaker.acquire()
+            started = time.monotonic()
+            try:
+                result = await call()
+            except asyncio.CancelledError:
+                self.breaker.release(probe)
+                raise
+            except Exception as e:
+                # Request-shaped errors (400, 422...) say nothing about upstream health
+                self.breaker.record(False if is_upstream_failure(e) else None, probe=probe)
+                LLM_CALL_SECONDS.observe(time.monotonic() - started, "error")
+                if attempt >= self.max_retries or not is_retryable(e):
+                    LLM_CALLS.inc("error")
+                    raise
+                LLM_CALLS.inc("retried")
+                attempt += 1
+                self.retries += 1
+                # Full jitter, but never sooner than the server asked for
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                delay = max(delay, _retry_after_header(e) or 0)
+                await asyncio.sleep(delay)
+            else:
+                latency = time.monotonic() - started
+                self.breaker.record(True, latency, probe=probe)
+                LLM_CALL_SECONDS.observe(latency, "ok")
+                LLM_CALLS.inc("ok")
+                return result
+
+    async def _admit(self, deadline: float):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerBusy("LLM queue is full", retry_after=self.queue_timeout)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), max(0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise SchedulerBusy("Timed out waiting for an LLM slot", retry_after=self.queue_timeout)
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self._slots.release()
+
+llm_scheduler = LLMScheduler()
+
+async def request_analysis(prompt: str, scheduler: LLMScheduler = None) -> str:
+    """Call OpenRouter for one analysis; raises on failure or an empty completion"""
+    response = await (scheduler or llm_scheduler).run(lambda: openai_client.chat.completions.create(
+        model=OPENROUTER_MODEL,
+        messages=[
+            {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=800,
+        temperature=0.7
+    ))
+    record_tokens(getattr(response, "usage", None))
+
+    analysis = response.choices[0].message.content
+    if not analysis:
+        raise ValueError("OpenRouter returned an empty completion")
+    return analysis
+
+async def stream_analysis(prompt: str) -> AsyncIterator[str]:
+    """Stream one analysis from OpenRouter as text deltas"""
+    chunks = llm_scheduler.stream(lambda: openai_client.chat.completions.create(
+        model=OPENROUTER_MODEL,
+        messages=[
+            {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=800,
+        temperature=0.7,
+        stream=True,
+    ))
+    try:
+        async for chunk in chunks:
+            # Providers that report usage on streams send it with the final chunk
+            record_tokens(getattr(chunk, "usage", None))
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        await chunks.aclose()
@@ -0,0 +1,158 @@
+"""
+Content-addressed cache for LLM analyses
+
+Keys are a hash of model + system prompt + user prompt. Lookups go through an
+in-memory LRU first and a persistent SQLite tier second; both expire entries
+after a TTL and are bounded in size. Concurrent requests for the same key share
+a single upstream call (single-flight).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from database import ConnectionPool, connect
+
+# Cache configuration
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "1024"))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "llm_cache.db")  # empty disables the SQLite tier
+LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "100000"))
+
+# Expired and excess rows are pruned once every this many writes
+PRUNE_EVERY = 100
+
+CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS analysis_cache (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        created_at REAL NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_analysis_cache_created_at
+        ON analysis_cache (created_at);
+"""
+SELECT_CACHE_SQL = "SELECT value, created_at FROM analysis_cache WHERE key = ? AND created_at >= ?"
+UPSERT_CACHE_SQL = "INSERT OR REPLACE INTO analysis_cache (key, value, created_at) VALUES (?, ?, ?)"
+PRUNE_EXPIRED_SQL = "DELETE FROM analysis_cache WHERE created_at < ?"
+PRUNE_EXCESS_SQL = """
+    DELETE FROM analysis_cache WHERE key IN (
+        SELECT key FROM analysis_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+    )
+"""
+
+def cache_key(model: str, system_prompt: str, prompt: str) -> str:
+    """Stable content hash identifying one completion request"""
+    payload = json.dumps([model, system_prompt, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class AnalysisCache:
+    """Two-tier (memory LRU + SQLite) TTL cache with single-flight fills"""
+
+    def __init__(self, ttl: float = LLM_CACHE_TTL, memory_size: int = LLM_CACHE_MEMORY_SIZE,
+                 db_path: str = LLM_CACHE_DB, max_rows: int = LLM_CACHE_MAX_ROWS):
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.max_rows = max_rows
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # key -> asyncio.Task filling that key
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._pool = None
+        if db_path:
+            conn = connect(db_path)
+            conn.executescript(CACHE_SCHEMA)
+            conn.close()
+            self._pool = ConnectionPool(db_path, readers=2, workers=2)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look a key up in memory, then in SQLite"""
+        value = self._memory_get(key)
+        if value is None and self._pool:
+            row = await self._pool.read(self._db_get, key, time.time() - self.ttl)
+            if row is not None:
+                value, created_at = row
+                self._memory_set(key, value, ttl=created_at + self.ttl - time.time())
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        """Store a value in both tiers"""
+        self._memory_set(key, value)
+        if self._pool:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+            await self._pool.write(self._db_set, key, value, prune)
+
+    async def get_or_create(self, key: str, producer: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached value for key, or run producer once for all concurrent callers"""
+        value = self._memory_get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        # Memory misses are counted by get() inside the fill
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fill(key, producer))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._fill_done(key, done))
+        else:
+            self.coalesced += 1
+        # Shielded so a disconnecting caller does not cancel the shared fill
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: str, producer: Callable[[], Awaitable[str]]) -> str:
+        value = await self.get(key)
+        if value is None:
+            value = await producer()
+            await self.set(key, value)
+        return value
+
+    def _fill_done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter went away
+            task.exception()
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_set(self, key: str, value: str, ttl: float = None):
+        self._memory[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def _db_get(conn: sqlite3.Connection, key: str, fresh_after: float) -> Optional[tuple]:
+        return conn.execute(SELECT_CACHE_SQL, (key, fresh_after)).fetchone()
+
+    def _db_set(self, conn: sqlite3.Connection, key: str, value: str, prune: bool):
+        now = time.time()
+        conn.execute(UPSERT_CACHE_SQL, (key, value, now))
+        if prune:
+            conn.execute(PRUNE_EXPIRED_SQL, (now - self.ttl,))
+            conn.execute(PRUNE_EXCESS_SQL, (self.max_rows,))
+
+    def close(self):
+        """Close the SQLite tier"""
+        if self._pool:
+            self._pool.close()
@@ -0,0 +1,171 @@
+"""
+Rule-based Hebrew analysis built from stored survey answers
+
+A fast local tier next to the LLM: tool recommendations are keyed by
+main_ai_goal, the learning path by ai_usage_level, and tips by ai_barriers and
+ai_learning_method. Every section is rendered once at import time, so building
+an analysis is a handful of dict lookups and a join (well under a millisecond).
+"""
+
+from typing import List
+
+# Stored in ai_analysis_version for analyses from this engine, so reanalyze.py --stale upgrades them
+LOCAL_ANALYSIS_VERSION = "local-1"
+
+GOAL_TOOLS = {
+    'לחסוך זמן ולשפר יעילות': [
+        ("ChatGPT", "לסיכום מיילים, מסמכים ופגישות בשניות"),
+        ("Make / Zapier", "לאוטומציה של משימות חוזרות בין האפליקציות שלך"),
+        ("Notion AI", "לארגון משימות והערות במקום אחד"),
+    ],
+    'לשפר פרודוקטיביות בעבודה/לימודים': [
+        ("ChatGPT", "לכתיבה, סיכום והסבר של חומר מורכב"),
+        ("Perplexity", "למחקר מהיר עם מקורות"),
+        ("NotebookLM", "ללמידה מתוך המסמכים והסיכומים שלך"),
+    ],
+    'להגביר יצירתיות ורעיונות': [
+        ("ChatGPT", "לסיעור מוחות ופיתוח רעיונות"),
+        ("Midjourney", "ליצירת תמונות והשראה ויזואלית"),
+        ("Runway", "ליצירה ועריכה של וידאו"),
+    ],
+    'לרכוש מיומנות טכנולוגית': [
+        ("ChatGPT", "כמורה פרטי לתכנות ולמושגי AI"),
+        ("GitHub Copilot", "לכתיבת קוד בעזרת AI"),
+        ("Google AI Studio", "להתנסות ישירה עם מודלים"),
+    ],
+    'לפתור בעיות ספציפיות': [
+        ("ChatGPT", "לפירוק בעיה לשלבים ולמציאת פתרונות"),
+        ("Claude", "לניתוח מסמכים ארוכים ובעיות מורכבות"),
+        ("Perplexity", "לחיפוש תשובות עדכניות עם מקורות"),
+    ],
+    'להיות בחזית הטכנולוגיה': [
+        ("Perplexity", "למעקב שוטף אחרי חדשות AI"),
+        ("Claude", "להתנסות במודלים מתקדמים"),
+        ("Hugging Face", "לגילוי מודלים וכלים חדשים בקוד פתוח"),
+    ],
+    'הזדמנויות עסקיות/הכנסה': [
+        ("ChatGPT", "לכתיבת תוכן שיווקי ותוכניות עסקיות"),
+        ("Canva AI", "לעיצוב מהיר של חומרים שיווקיים"),
+        ("Make / Zapier", "לאוטומציה של תהליכים בעסק"),
+    ],
+}
+DEFAULT_TOOLS = [
+    ("ChatGPT", "מושלם לשיפור הפרודוקטיביות והלמידה"),
+    ("Claude", "מעולה לכתיבה ופתרון בעיות מורכבות"),
+    ("Perplexity", "מצוין למחקר ואיסוף מידע"),
+]
+
+GOAL_PROJECTS = {
+    'לחסוך זמן ולשפר יעילות': "בנה אוטומציה שמסכמת לך כל בוקר את המיילים וההודעות החשובים.",
+    'לשפר פרודוקטיביות בעבודה/לימודים': "צור עוזר אישי שמסכם לך מסמכים ומכין שאלות חזרה.",
+    'להגביר יצירתיות ורעיונות': "צור סדרת תמונות או סרטון קצר סביב רעיון שמלהיב אותך.",
+    'לרכוש מיומנות טכנולוגית': "בנה אתר או בוט פשוט, כש-ChatGPT משמש לך מורה לתכנות.",
+    'לפתור בעיות ספציפיות': "בחר בעיה אחת שחוזרת אצלך כל שבוע ובנה לה פרומפט קבוע שפותר אותה.",
+    'להיות בחזית הטכנולוגיה': "כתוב סקירה שבועית קצרה על חידושי AI ושתף אותה עם חברים.",
+    'הזדמנויות עסקיות/הכנסה': "צור דף נחיתה ותוכן שיווקי לרעיון עסקי קטן ובדוק את התגובות.",
+}
+DEFAULT_PROJECT = "בחר משימה יומיומית אחת ונסה לבצע אותה בעזרת AI במשך שבוע."
+
+LEVEL_PROFILES = {
+    'כן – ואני משתמש באופן קבוע': "אתה כבר משתמש ב-AI באופן קבוע, וזה הזמן להעמיק ולהפיק ממנו יותר.",
+    'כן – ניסיתי אבל לא הבנתי איך': "כבר ניסית כלי AI, ועכשיו נשאר רק למצוא את הדרך הנכונה בשבילך.",
+    'לא – אבל אני ממש רוצה ללמוד': "יש לך רצון אמיתי ללמוד, וזו נקודת הפתיחה הכי חשובה.",
+    'לא מכיר בכלל': "אתה בתחילת הדרך, וזה בדיוק הזמן הטוב ביותר להתחיל.",
+}
+DEFAULT_PROFILE = "יש לך עניין אמיתי בטכנולוגיות AI."
+
+LEVEL_PATHS = {
+    'כן – ואני משתמש באופן קבוע': [
+        "העמק בהנדסת פרומפטים מתקדמת: תפקידים, דוגמאות ושרשור משימות",
+        "שלב AI בתהליך עבודה שלם מקצה לקצה",
+        "נסה כלי אוטומציה וחיבורים בין כלים",
+        "שתף את מה שלמדת בקהילה",
+    ],
+    'כן – ניסיתי אבל לא הבנתי איך': [
+        "התחל מחדש עם משימה אחת קטנה ויומיומית",
+        "למד את מבנה הפרומפט הבסיסי: הקשר, משימה ופורמט התשובה",
+        "שמור פרומפטים שעבדו ושפר אותם עם הזמן",
+        "הוסף כלי שני רק כשהראשון מרגיש טבעי",
+    ],
+    'לא – אבל אני ממש רוצה ללמוד': [
+        "פתח חשבון חינמי ב-ChatGPT ושאל שאלה מהיום שלך",
+        "צפה בסרטון מבוא קצר בעברית",
+        "התנסה עשר דקות ביום במשך שבוע",
+        "נסה לפתור משימה אמיתית מהעבודה או מהלימודים",
+    ],
+    'לא מכיר בכלל': [
+        "קרא הסבר פשוט על מה AI יודע לעשות",
+        "צפה בהדגמה של ChatGPT בעברית",
+        "כתוב שאלה ראשונה - אפשר בעברית",
+        "הצטרף לקהילה של מתחילים",
+    ],
+}
+DEFAULT_PATH = [
+    "התחל עם ChatGPT בפרויקטים קטנים יומיומיים",
+    "למד הנדסת פרומפטים בסיסית",
+    "יישם AI בתחום העיסוק שלך",
+]
+
+BARRIER_TIPS = {
+    'הכל באנגלית': "רוב הכלים מבינים ועונים בעברית - פשוט כתוב בעברית ובקש תשובה בעברית.",
+    'אני לא מבין איך זה עובד': "לא צריך להבין את הטכנולוגיה כדי להשתמש בה - התחל מדוגמאות מוכנות.",
+    'אין לי כסף להשקיע בזה': "לכל הכלים שהומלצו כאן יש גרסה חינמית שמספיקה להתחלה.",
+    'אני לבד ואין לי ממי ללמוד': "קהילות AI בעברית בוואטסאפ ובפייסבוק הן מקום מצוין לשאול וללמוד.",
+    'אני לא סומך על זה': "התייחס לתשובות כטיוטה: בדוק עובדות חשובות ואל תשתף מידע רגיש.",
+}
+
+LEARNING_TIPS = {
+    'אונליין (קורסים, יוטיוב, בלוגים)': "קורסים חינמיים וערוצי יוטיוב בעברית יתאימו לסגנון הלמידה שלך.",
+    'ניסוי וטעייה עצמאית': "קבע לעצמך אתגר שבועי קטן ונסה לפתור אותו עם AI.",
+    'קהילות וקבוצות (וואטסאפ, פייסבוק)': "קבוצות AI בעברית ייתנו לך טיפים ודוגמאות מהשטח.",
+    'סדנאות / וובינרים': "חפש וובינרים חינמיים למתחילים - רבים מהם בעברית.",
+    'חברים / עמיתים': "מצא שותף ללמידה ונסו יחד את אותו הכלי.",
+}
+
+def _numbered(lines: List[str]) -> str:
+    return "\n".join(f"{number}. {line}" for number, line in enumerate(lines, start=1))
+
+def _tools_section(tools: list) -> str:
+    return _numbered([f"**{name}** - {use}" for name, use in tools])
+
+# Pre-rendered sections, so each analysis only looks up and joins strings
+_TOOL_SECTIONS = {goal: _tools_section(tools) for goal, tools in GOAL_TOOLS.items()}
+_DEFAULT_TOOL_SECTION = _tools_section(DEFAULT_TOOLS)
+_PATH_SECTIONS = {level: _numbered(path) for level, path in LEVEL_PATHS.items()}
+_DEFAULT_PATH_SECTION = _numbered(DEFAULT_PATH)
+_BARRIER_LINES = {barrier: f"• {tip}" for barrier, tip in BARRIER_TIPS.items()}
+_LEARNING_LINES = {method: f"• {tip}" for method, tip in LEARNING_TIPS.items()}
+
+def _choices(value) -> list:
+    return value if isinstance(value, list) else []
+
+def generate_local_analysis(survey: dict) -> str:
+    """Personalized Hebrew analysis from survey answers, without calling an LLM"""
+    goal = survey.get('main_ai_goal')
+    level = survey.get('ai_usage_level')
+
+    profile = LEVEL_PROFILES.get(level, DEFAULT_PROFILE)
+    if goal == 'אחר' and survey.get('main_ai_goal_other'):
+        profile += f"\nהמטרה שלך: {survey['main_ai_goal_other']}."
+    elif goal:
+        profile += f"\nהמטרה העיקרית שלך: {goal}."
+
+    parts = [
+        "🎯 **הפרופיל האישי שלך**", profile, "",
+        "🚀 **כלי AI מומלצים עבורך**", _TOOL_SECTIONS.get(goal, _DEFAULT_TOOL_SECTION), "",
+        "📚 **נתיב הלמידה שלך**", _PATH_SECTIONS.get(level, _DEFAULT_PATH_SECTION),
+    ]
+    learning = [_LEARNING_LINES[method] for method in _choices(survey.get('ai_learning_method'))
+                if method in _LEARNING_LINES]
+    if learning:
+        parts += learning
+    barriers = [_BARRIER_LINES[barrier] for barrier in _choices(survey.get('ai_barriers'))
+                if barrier in _BARRIER_LINES]
+    if barriers:
+        parts += ["", "🧱 **איך מתגברים על המחסומים**"] + barriers
+
+    parts += ["", "💡 **רעיון לפרויקט ראשון**", GOAL_PROJECTS.get(goal, DEFAULT_PROJECT)]
+    if survey.get('ai_creation_dream'):
+        parts.append(f"ובהמשך - לקראת החלום שלך: \"{survey['ai_creation_dream']}\".")
+    parts += ["", "✨ בהצלחה במסע שלך עם AI!"]
+    return "\n".join(parts)
@@ -1,18 +1,55 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
-import sqlite3
-import json
+from contextlib import asynccontextmanager
+import asyncio
 import datetime
-import os
+import json
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 
-# Load environment variables
+# Load environment variables (before local modules read their configuration)
 load_dotenv()
 
-app = FastAPI(title="AI Navigator API", version="1.0.0")
+from database import (
+    DB_FILE, ConnectionPool, init_db, decode_cursor,
+    insert_survey, bulk_insert_surveys, fetch_surveys_json, fetch_survey, fetch_stats, fetch_table_version,
+)
+from bulk import is_ndjson, prepare_import
+from export import EXPORT_FORMATS, iter_ndjson, iter_csv
+from http_cache import ResponseCache, cached_response, encode_body
+from serialization import FastJSONResponse
+from metrics import ANALYSES, REGISTRY, MetricsMiddleware
+from aggregates import compute_aggregates
+from crosstab import compute_crosstab, validate_crosstab
+from terms import TEXT_FIELDS, fetch_top_terms
+from search import search_surveys
+from trends import TREND_BUCKETS, fetch_trends
+from llm_cache import AnalysisCache, cache_key
+import llm
+from llm import (
+    ANALYSIS_SYSTEM_PROMPT, OPENROUTER_MODEL, CircuitOpen, SchedulerBusy, llm_scheduler,
+    request_analysis, stream_analysis,
+)
+from ingest import INGEST_MODE, BatchWriter
+from analysis_jobs import AnalysisJobs
+from local_analysis import generate_local_analysis
+from models import SurveyResponse, AnalysisRequest, CrosstabRequest, SURVEY_FIELDS
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if batch_writer:
+        batch_writer.start()
+    analysis_jobs.start()
+    yield
+    await analysis_jobs.stop()
+    if batch_writer:
+        await batch_writer.stop()
+    analysis_cache.close()
+    db_pool.close()
+
+app = FastAPI(title="AI Navigator API", version="1.0.0", lifespan=lifespan,
+              default_response_class=FastJSONResponse)
 
 # CORS middleware for frontend
 app.add_middleware(
@@ -26,137 +63,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# OpenRouter configuration
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
-OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "microsoft/phi-3-mini-128k-instruct:free")
+# Request counts and latencies per route, exposed on /metrics
+app.add_middleware(MetricsMiddleware)
 
-# Initialize OpenAI client for OpenRouter
-openai_client = AsyncOpenAI(
-    base_url=OPENROUTER_BASE_URL,
-    api_key=OPENROUTER_API_KEY,
-) if OPENROUTER_API_KEY else None
+# Cache of completed analyses (memory LRU + SQLite), keyed by prompt content
+analysis_cache = AnalysisCache()
 
 # Database setup
-DB_FILE = "survey_responses.db"
-
-def init_db():
-    """Initialize SQLite database with survey_responses table"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS survey_responses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            age_group TEXT,
-            current_activity TEXT,
-            self_definition TEXT,
-            self_definition_other TEXT,
-            known_ai_tools TEXT,
-            ai_usage_level TEXT,
-            ai_experience TEXT,
-            ai_learning_method TEXT,
-            ai_learning_method_other TEXT,
-            main_ai_goal TEXT,
-            main_ai_goal_other TEXT,
-            biggest_ai_challenge TEXT,
-            ai_creation_dream TEXT,
-            future_ai_impact TEXT,
-            monthly_spending TEXT,
-            ai_barriers TEXT,
-            barriers_other TEXT,
-            community_interest TEXT,
-            specific_ai_help TEXT,
-            specific_ai_help_other TEXT,
-            investment_willingness TEXT,
-            platform_access TEXT,
-            first_name TEXT,
-            email TEXT,
-            completion_time INTEGER,
-            ai_analysis TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
-
-# Initialize database on startup
 init_db()
-
-# Pydantic models
-class SurveyResponse(BaseModel):
-    age_group: Optional[str] = None
-    current_activity: Optional[List[str]] = None
-    self_definition: Optional[str] = None
-    self_definition_other: Optional[str] = None
-    known_ai_tools: Optional[List[str]] = None
-    ai_usage_level: Optional[str] = None
-    ai_experience: Optional[str] = None
-    ai_learning_method: Optional[List[str]] = None
-    ai_learning_method_other: Optional[str] = None
-    main_ai_goal: Optional[str] = None
-    main_ai_goal_other: Optional[str] = None
-    biggest_ai_challenge: Optional[str] = None
-    ai_creation_dream: Optional[str] = None
-    future_ai_impact: Optional[str] = None
-    monthly_spending: Optional[str] = None
-    ai_barriers: Optional[List[str]] = None
-    barriers_other: Optional[str] = None
-    community_interest: Optional[str] = None
-    specific_ai_help: Optional[str] = None
-    specific_ai_help_other: Optional[str] = None
-    investment_willingness: Optional[str] = None
-    platform_access: Optional[str] = None
-    first_name: Optional[str] = None
-    email: Optional[str] = None
-    completion_time: Optional[int] = None
-    ai_analysis: Optional[str] = None
-
-class AnalysisRequest(BaseModel):
-    prompt: str
-    add_context_from_internet: bool = False
-
-def generate_ai_analysis(responses: dict) -> str:
-    """Simple AI analysis generator based on survey responses"""
-    
-    # Extract key information
-    age = responses.get('age_group', 'לא צוין')
-    activity = ', '.join(responses.get('current_activity', [])) if responses.get('current_activity') else 'לא צוין'
-    definition = responses.get('self_definition', 'לא צוין')
-    tools = ', '.join(responses.get('known_ai_tools', [])) if responses.get('known_ai_tools') else 'לא צוין'
-    usage_level = responses.get('ai_usage_level', 'לא צוין')
-    main_goal = responses.get('main_ai_goal', 'לא צוין')
-    
-    # Generate personalized analysis
-    analysis = f"""
-🎯 **הפרופיל האישי שלך**
-
-בהתבסס על התשובות שלך, אני רואה שאתה {definition.lower()} בגיל {age}, {activity}. 
-המטרה העיקרית שלך עם AI היא {main_goal.lower()}, והניסיון שלך כרגע הוא ברמה של "{usage_level}".
-
-🚀 **המלצות מותאמות אישית**
-
-בהתבסס על הפרופיל שלך, אני ממליץ להתמקד ב:
-
-1. **ChatGPT** - מושלם לשיפור הפרודוקטיביות והלמידה
-2. **Claude** - מעולה לכתיבה ופתרון בעיות מורכבות  
-3. **Perplexity** - מצוין למחקר ואיסוף מידע
-
-📚 **נתיב הלמידה המומלץ**
-
-1. התחל עם ChatGPT בפרויקטים קטנים יומיומיים
-2. למד על הנדסת פרומפטים (Prompt Engineering)
-3. נסה ליישם AI בתחום העיסוק שלך
-
-💡 **רעיון לפרויקט ראשון**
-
-מומלץ לבחור פרויקט קטן הקשור לתחום שלך - למשל אוטומציה של משימה יומיומית או יצירת תוכן מותאם אישית.
-
-בהצלחה במסע שלך עם AI! 🌟
-    """
-    
-    return analysis.strip()
+db_pool = ConnectionPool(DB_FILE)
+
+# Group-commit ingestion for POST /api/surveys (INGEST_MODE=batch)
+batch_writer = BatchWriter(db_pool) if INGEST_MODE == "batch" else None
+
+# Serialized GET bodies, valid until survey_responses changes
+response_cache = ResponseCache()
+
+# Worker pool for POST /api/surveys/{id}/analysis
+analysis_jobs = AnalysisJobs(db_pool, analysis_cache)
+
+# Counters owned by the components above, read when /metrics is scraped
+REGISTRY.callback("analysis_cache_requests_total", "Analysis cache lookups, by result", "counter",
+                  lambda: {("hit",): analysis_cache.hits, ("miss",): analysis_cache.misses,
+                           ("coalesced",): analysis_cache.coalesced}, ("result",))
+REGISTRY.callback("response_cache_requests_total", "Cached GET body lookups, by result", "counter",
+                  lambda: {("hit",): response_cache.hits, ("miss",): response_cache.misses}, ("result",))
+REGISTRY.callback("response_cache_bytes", "Bytes held by the GET body cache", "gauge", lambda: response_cache.size)
+REGISTRY.callback("llm_in_flight", "LLM calls currently running", "gauge", lambda: llm_scheduler.in_flight)
+REGISTRY.callback("llm_waiting", "Callers queued for an LLM slot", "gauge", lambda: llm_scheduler.waiting)
+REGISTRY.callback("llm_rejected_total", "Calls refused because the LLM queue was full or timed out", "counter",
+                  lambda: llm_scheduler.rejected)
+REGISTRY.callback("llm_short_circuited_total", "Calls refused while the circuit breaker was open", "counter",
+                  lambda: llm_scheduler.breaker.short_circuited)
+REGISTRY.callback("llm_circuit_state", "1 for the circuit breaker's current state", "gauge",
+                  lambda: {(state,): int(llm_scheduler.breaker.state == state)
+                           for state in ("closed", "open", "half_open")}, ("state",))
+REGISTRY.callback("analysis_jobs_queued", "Analysis jobs waiting for a worker", "gauge", lambda: analysis_jobs.queued)
+REGISTRY.callback("analysis_jobs_total", "Finished analysis jobs, by result", "counter",
+                  lambda: {("completed",): analysis_jobs.completed, ("local",): analysis_jobs.local,
+                                  ("failed",): analysis_jobs.failed}, ("result",))
 
 # API endpoints
 @app.get("/")
@@ -168,153 +113,459 @@ async def health_check():
     return {
         "status": "healthy",
         "database": "sqlite",
+        "llm": {
+            "configured": llm.openai_client is not None,
+            "circuit": llm_scheduler.breaker.snapshot(),
+        },
         "timestamp": datetime.datetime.now().isoformat()
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of request, database, LLM and cache metrics"""
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/api/surveys")
 async def create_survey(survey: SurveyResponse):
     """Create a new survey response"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
-        # Convert lists to JSON strings for storage
-        data = survey.dict()
-        for field in ['current_activity', 'known_ai_tools', 'ai_learning_method', 'ai_barriers']:
-            if data.get(field):
-                data[field] = json.dumps(data[field])
-        
-        # Insert survey response
-        columns = list(data.keys())
-        placeholders = ', '.join(['?' for _ in columns])
-        query = f"INSERT INTO survey_responses ({', '.join(columns)}) VALUES ({placeholders})"
-        
-        cursor.execute(query, list(data.values()))
-        survey_id = cursor.lastrowid
-        
-        conn.commit()
-        conn.close()
+        if batch_writer:
+            survey_id = await batch_writer.submit(survey.dict())
+        else:
+            survey_id = await db_pool.write(insert_survey, survey.dict())
         
         return {"id": survey_id, "message": "Survey created successfully"}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating survey: {str(e)}")
 
-@app.get("/api/surveys")
-async def get_surveys(limit: int = 100, offset: int = 0):
-    """Get all survey responses"""
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma separated ?fields= projection, validated against SurveyResponse"""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in SURVEY_FIELDS and field not in ("id", "created_at")]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+async def versioned_response(request: Request, key: tuple, compute, extra_validity=None,
+                             min_modified: int = 0) -> Response:
+    """Serve compute()'s result from the body cache while the table version is unchanged
+    
+    Answers 304 when the client's ETag / Last-Modified is still current.
+    """
+    version, modified_at = await db_pool.read(fetch_table_version)
+    validity = (version, extra_validity)
+    entry = response_cache.get(key, validity)
+    if entry is None:
+        entry = response_cache.set(key, validity, encode_body(await compute()))
+    return cached_response(request, *entry, max(modified_at, min_modified))
+
+# Per-row errors returned by the bulk endpoint are capped to keep responses small
+BULK_MAX_REPORTED_ERRORS = 1000
+
+@app.post("/api/surveys/bulk")
+async def create_surveys_bulk(request: Request):
+    """Import many survey responses (JSON array or NDJSON) in a single transaction"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM survey_responses 
-            ORDER BY created_at DESC 
-            LIMIT ? OFFSET ?
-        """, (limit, offset))
+        body = (await request.body()).decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be UTF-8 encoded")
+    
+    try:
+        ndjson = is_ndjson(body, request.headers.get("content-type", ""))
+        loop = asyncio.get_running_loop()
+        rows, errors = await loop.run_in_executor(None, prepare_import, body, ndjson)
         
-        rows = cursor.fetchall()
-        columns = [description[0] for description in cursor.description]
+        result = await db_pool.write(bulk_insert_surveys, rows)
         
-        surveys = []
-        for row in rows:
-            survey = dict(zip(columns, row))
-            # Convert JSON strings back to lists
-            for field in ['current_activity', 'known_ai_tools', 'ai_learning_method', 'ai_barriers']:
-                if survey.get(field):
-                    try:
-                        survey[field] = json.loads(survey[field])
-                    except:
-                        pass
-            surveys.append(survey)
+        return {
+            **result,
+            "failed": len(errors),
+            "errors": errors[:BULK_MAX_REPORTED_ERRORS],
+            "message": f"Imported {result['inserted']} surveys",
+        }
         
-        conn.close()
-        return {"surveys": surveys, "total": len(surveys)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing surveys: {str(e)}")
+
+@app.get("/api/surveys")
+async def get_surveys(request: Request, limit: int = 100, offset: int = 0, after: Optional[str] = None,
+                      fields: Optional[str] = None):
+    """Get survey responses, newest first
+    
+    Pass the returned `next_cursor` as `after` to fetch the next page; `offset`
+    is still accepted but gets slower the deeper it pages. `fields` is a comma
+    separated projection (id and created_at are always returned).
+    """
+    try:
+        cursor = decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    columns = parse_fields(fields)
+    
+    try:
+        key = ("surveys", limit, offset, after, tuple(columns or ()))
+        return await versioned_response(
+            request, key, lambda: db_pool.read(fetch_surveys_json, limit, offset, cursor, columns))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching surveys: {str(e)}")
 
-@app.get("/api/surveys/{survey_id}")
-async def get_survey(survey_id: int):
-    """Get a specific survey response"""
+@app.get("/api/surveys/export")
+async def export_surveys(format: str = "ndjson"):
+    """Stream every survey response as NDJSON or CSV"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    
+    # Sync generators are iterated in the threadpool, off the event loop
+    rows = iter_ndjson(db_pool.path) if format == "ndjson" else iter_csv(db_pool.path)
+    filename = f"survey_responses.{format}"
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.get("/api/surveys/aggregates")
+async def get_aggregates(request: Request):
+    """Get dashboard distributions and completion time statistics"""
+    try:
+        return await versioned_response(request, ("aggregates",), lambda: db_pool.read(compute_aggregates))
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing aggregates: {str(e)}")
+
+@app.post("/api/surveys/crosstab")
+async def crosstab(request: Request, query: CrosstabRequest):
+    """Cross-tabulate two or more categorical / multi-select fields, with optional filters
+    
+    Results are cached until survey_responses changes.
+    """
+    filters = {field: values for field, values in query.filters.items() if values}
+    try:
+        validate_crosstab(query.dimensions, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
+        key = ("crosstab", tuple(query.dimensions),
+               tuple(sorted((field, tuple(values)) for field, values in filters.items())))
+        return await versioned_response(
+            request, key, lambda: db_pool.read(compute_crosstab, query.dimensions, filters))
         
-        cursor.execute("SELECT * FROM survey_responses WHERE id = ?", (survey_id,))
-        row = cursor.fetchone()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing crosstab: {str(e)}")
+
+@app.get("/api/surveys/stats")
+async def get_stats(request: Request):
+    """Get survey statistics (total and today's count, from maintained counters)"""
+    try:
+        # "today" rolls over at UTC midnight (SQLite's DATE('now')) even without writes
+        now = datetime.datetime.now(datetime.timezone.utc)
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return await versioned_response(request, ("stats",), lambda: db_pool.read(fetch_stats),
+                                        extra_validity=now.date(), min_modified=int(midnight.timestamp()))
         
-        if not row:
-            raise HTTPException(status_code=404, detail="Survey not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching stats: {str(e)}")
+
+# Largest top-K accepted by /api/surveys/terms
+TERMS_MAX_K = 100
+
+def parse_day(value: Optional[str], name: str) -> Optional[str]:
+    """Validate a YYYY-MM-DD query parameter"""
+    if value is None:
+        return None
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be a YYYY-MM-DD date")
+
+@app.get("/api/surveys/terms")
+async def get_terms(request: Request, fields: Optional[str] = None, k: int = 15,
+                    start: Optional[str] = Query(None, alias="from"), end: Optional[str] = Query(None, alias="to")):
+    """Most frequent terms in the free-text answers, per field
+    
+    Read from the term index maintained on insert. `from` / `to` (inclusive,
+    UTC dates) limit the counts to responses submitted in that window.
+    """
+    requested = [field.strip() for field in fields.split(",") if field.strip()] if fields else TEXT_FIELDS
+    unknown = [field for field in requested if field not in TEXT_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Fields are not indexed: {', '.join(unknown)}")
+    if not 1 <= k <= TERMS_MAX_K:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {TERMS_MAX_K}")
+    start, end = parse_day(start, "from"), parse_day(end, "to")
+    
+    try:
+        key = ("terms", tuple(requested), k, start, end)
+        return await versioned_response(
+            request, key, lambda: db_pool.read(fetch_top_terms, requested, k, start, end))
         
-        columns = [description[0] for description in cursor.description]
-        survey = dict(zip(columns, row))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching terms: {str(e)}")
+
+def parse_instant(value: Optional[str], name: str, end: bool = False) -> Optional[str]:
+    """Validate a date or date-time query parameter as UTC 'YYYY-MM-DD HH:MM:SS'
+    
+    A bare date as an end bound means the end of that day.
+    """
+    if value is None:
+        return None
+    try:
+        instant = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be an ISO date or date-time")
+    if instant.tzinfo is not None:
+        instant = instant.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    if end and len(value) == 10:
+        instant = instant.replace(hour=23, minute=59, second=59)
+    return instant.strftime("%Y-%m-%d %H:%M:%S")
+
+@app.get("/api/surveys/trends")
+async def get_trends(request: Request, bucket: str = "day",
+                     start: Optional[str] = Query(None, alias="from"), end: Optional[str] = Query(None, alias="to")):
+    """Submission counts, average completion time and interest counts per hour, day or week
+    
+    Answered from the rollup table maintained by triggers. `from` / `to` are
+    inclusive ISO dates or date-times, in UTC unless an offset is given.
+    """
+    if bucket not in TREND_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of: {', '.join(TREND_BUCKETS)}")
+    start, end = parse_instant(start, "from"), parse_instant(end, "to", end=True)
+    
+    try:
+        key = ("trends", bucket, start, end)
+        return await versioned_response(request, key, lambda: db_pool.read(fetch_trends, bucket, start, end))
         
-        # Convert JSON strings back to lists
-        for field in ['current_activity', 'known_ai_tools', 'ai_learning_method', 'ai_barriers']:
-            if survey.get(field):
-                try:
-                    survey[field] = json.loads(survey[field])
-                except:
-                    pass
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching trends: {str(e)}")
+
+# Largest page accepted by /api/surveys/search
+SEARCH_MAX_LIMIT = 100
+
+@app.get("/api/surveys/search")
+async def search_responses(request: Request, q: str, limit: int = 20, offset: int = 0):
+    """Full-text search over free-text answers and analyses, best matches first
+    
+    Words must all appear (`word*` matches a prefix, `"..."` a phrase). Each
+    result has the survey id, a snippet with `<mark>` around the matches and a
+    score; pass `next_offset` back as `offset` for the next page.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q must not be empty")
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SEARCH_MAX_LIMIT}")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must not be negative")
+    
+    try:
+        key = ("search", q, limit, offset)
+        return await versioned_response(request, key, lambda: db_pool.read(search_surveys, q, limit, offset))
         
-        conn.close()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching surveys: {str(e)}")
+
+@app.get("/api/surveys/{survey_id}")
+async def get_survey(request: Request, survey_id: int, fields: Optional[str] = None):
+    """Get a specific survey response, optionally projected to `fields`"""
+    columns = parse_fields(fields)
+    
+    async def load():
+        survey = await db_pool.read(fetch_survey, survey_id, columns)
+        if not survey:
+            raise HTTPException(status_code=404, detail="Survey not found")
         return survey
+    
+    try:
+        return await versioned_response(request, ("survey", survey_id, tuple(columns or ())), load)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching survey: {str(e)}")
 
+@app.post("/api/surveys/{survey_id}/analysis", status_code=202)
+async def request_survey_analysis(survey_id: int, force: bool = False):
+    """Queue a background AI analysis of a stored survey; poll GET for the result
+    
+    Surveys that already have an analysis are not re-analyzed unless `force` is set.
+    Without OpenRouter configured, jobs store the local rule-based analysis.
+    """
+    try:
+        survey = await db_pool.read(fetch_survey, survey_id, ["ai_analysis"])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching survey: {str(e)}")
+    if not survey:
+        raise HTTPException(status_code=404, detail="Survey not found")
+    if survey["ai_analysis"] and not force:
+        return {"survey_id": survey_id, "status": "done", "error": None, "analysis": survey["ai_analysis"]}
+    
+    try:
+        return analysis_jobs.enqueue(survey_id)
+    except asyncio.QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many analyses queued",
+            headers={"Retry-After": str(max(1, int(llm.LLM_QUEUE_TIMEOUT)))},
+        )
+
+@app.get("/api/surveys/{survey_id}/analysis")
+async def get_survey_analysis(survey_id: int):
+    """Get the status of a survey's analysis job and the stored analysis
+    
+    While a job is still pending, `preview` holds an instant local analysis.
+    """
+    try:
+        survey = await db_pool.read(fetch_survey, survey_id, None)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching survey: {str(e)}")
+    if not survey:
+        raise HTTPException(status_code=404, detail="Survey not found")
+    
+    job = analysis_jobs.status(survey_id)
+    if job:
+        result = dict(job)
+    else:
+        # No job in memory (never requested, or before a restart): report what is stored
+        result = {"survey_id": survey_id, "status": "done" if survey["ai_analysis"] else "none", "error": None}
+    result["analysis"] = survey["ai_analysis"]
+    if result["status"] in ("queued", "running") and not survey["ai_analysis"]:
+        result["preview"] = generate_local_analysis(survey)
+    return result
+
+def fallback_analysis(request: AnalysisRequest) -> tuple:
+    """(analysis, source): the local engine when answers were sent, else the static text"""
+    if request.responses is not None:
+        return generate_local_analysis(request.responses.dict()), "local"
+    return get_fallback_analysis(), "fallback"
+
+def analysis_response(analysis: str, source: str) -> dict:
+    """Body of /api/ai/analyze, counted per source for the fallback rate"""
+    ANALYSES.inc(source)
+    return {"analysis": analysis, "source": source}
+
+def use_local_engine(request: AnalysisRequest) -> bool:
+    """Whether to skip the LLM: asked for, or "auto" while every LLM slot is busy"""
+    if request.engine == "local":
+        return True
+    return request.engine == "auto" and request.responses is not None and llm_scheduler.saturated
+
 @app.post("/api/ai/analyze")
 async def analyze_responses(request: AnalysisRequest):
-    """Generate AI analysis for survey responses using OpenRouter"""
+    """Generate AI analysis for survey responses using OpenRouter
+    
+    `source` in the response tells whether it came from the LLM, the local
+    rule-based engine (`local`) or the static fallback text.
+    """
     try:
-        if not openai_client:
-            # Fallback to static analysis if OpenRouter is not configured
-            return {"analysis": get_fallback_analysis()}
+        if not llm.openai_client or use_local_engine(request):
+            # Local engine (or static fallback) if asked for, saturated or not configured
+            analysis, source = fallback_analysis(request)
+            return analysis_response(analysis, source)
         
-        # Enhanced system prompt for better Hebrew analysis
-        system_prompt = """
-אתה מומחה AI שמסייע לאנשים בישראל להבין ולהתחיל להשתמש בטכנולוגיות בינה מלאכותית.
-המטרה שלך היא לנתח תשובות שאלון ולתת המלצות מותאמות אישית בעברית.
-
-הנחיות לניתוח:
-1. כתוב בעברית בטון חם, מעודד ומקצועי
-2. תן המלצות ספציפיות ומעשיות 
-3. התמקד בכלי AI חינמיים ונגישים
-4. הצע נתיב למידה הדרגתי
-5. כלול רעיון לפרויקט ראשון מותאם אישית
-6. השתמש באמוג'י להפיכת התוכן לחזותי יותר
-
-מבנה הניתוח:
-🎯 פרופיל אישי (2-3 שורות)
-🚀 המלצות לכלי AI (3 כלים ספציפיים)
-📚 נתיב למידה מומלץ (3-4 צעדים)
-💡 רעיון לפרויקט ראשון
-✨ עידוד לסיום
-
-אורך: כ-250 מילים.
-        """
+        # Identical prompts are answered from the cache; concurrent ones share one call
+        key = cache_key(OPENROUTER_MODEL, ANALYSIS_SYSTEM_PROMPT, request.prompt)
+        analysis = await analysis_cache.get_or_create(key, lambda: request_analysis(request.prompt))
+        return analysis_response(analysis, "llm")
         
-        # Call OpenRouter API
-        response = await openai_client.chat.completions.create(
-            model=OPENROUTER_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": request.prompt}
-            ],
-            max_tokens=800,
-            temperature=0.7
+    except CircuitOpen:
+        # OpenRouter is known to be down: answer instantly instead of waiting for a timeout
+        analysis, source = fallback_analysis(request)
+        return analysis_response(analysis, source)
+    except SchedulerBusy as e:
+        if request.responses is not None and request.engine == "auto":
+            analysis, source = fallback_analysis(request)
+            return analysis_response(analysis, source)
+        # Too many queued analyses: fail fast so clients can retry later
+        raise HTTPException(
+            status_code=503,
+            detail=f"AI analysis is busy: {str(e)}",
+            headers={"Retry-After": str(e.retry_after)},
         )
-        
-        analysis = response.choices[0].message.content
-        return {"analysis": analysis}
-        
     except Exception as e:
         # Return fallback analysis if OpenRouter fails
         print(f"OpenRouter API error: {str(e)}")
-        return {"analysis": get_fallback_analysis()}
+        analysis, source = fallback_analysis(request)
+        return analysis_response(analysis, source)
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event"""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n" if event else f"data: {payload}\n\n"
+
+def text_events(text: str, source: str):
+    """Stream an already complete analysis line by line, in the same format as live deltas"""
+    for line in text.splitlines(keepends=True):
+        yield sse_event({"delta": line})
+    ANALYSES.inc(source)
+    yield sse_event({"source": source}, event="done")
+
+async def relay_events(first: str, deltas, key: str):
+    """Forward live deltas as SSE and cache the full analysis once it completes"""
+    parts = [first]
+    try:
+        yield sse_event({"delta": first})
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                yield sse_event({"delta": delta})
+        except Exception as e:
+            print(f"OpenRouter stream error: {str(e)}")
+            yield sse_event({"detail": "The analysis stream was interrupted"}, event="error")
+            return
+        await analysis_cache.set(key, "".join(parts))
+        ANALYSES.inc("llm")
+        yield sse_event({"source": "llm"}, event="done")
+    finally:
+        # A disconnected client stops iterating here; close upstream and free the LLM slot now
+        await deltas.aclose()
+
+async def first_delta(deltas) -> str:
+    """Wait for a stream's first delta, closing the stream if none arrives"""
+    try:
+        return await deltas.__anext__()
+    except BaseException:
+        await deltas.aclose()
+        raise
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+@app.post("/api/ai/analyze/stream")
+async def analyze_responses_stream(request: AnalysisRequest):
+    """Stream AI analysis as Server-Sent Events (`data: {"delta": ...}`, then `event: done`)"""
+    if not llm.openai_client or use_local_engine(request):
+        return StreamingResponse(text_events(*fallback_analysis(request)),
+                                 media_type="text/event-stream", headers=SSE_HEADERS)
+    
+    key = cache_key(OPENROUTER_MODEL, ANALYSIS_SYSTEM_PROMPT, request.prompt)
+    cached = await analysis_cache.get(key)
+    if cached:
+        return StreamingResponse(text_events(cached, "cache"), media_type="text/event-stream", headers=SSE_HEADERS)
+    
+    # Wait for the first delta here so busy/failed upstream calls can still
+    # change the status code or fall back before the response starts
+    deltas = stream_analysis(request.prompt)
+    try:
+        first = await first_delta(deltas)
+    except SchedulerBusy as e:
+        if request.responses is not None and request.engine == "auto":
+            return StreamingResponse(text_events(*fallback_analysis(request)),
+                                     media_type="text/event-stream", headers=SSE_HEADERS)
+        raise HTTPException(
+            status_code=503,
+            detail=f"AI analysis is busy: {str(e)}",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except Exception as e:
+        if not isinstance(e, (StopAsyncIteration, CircuitOpen)):
+            print(f"OpenRouter API error: {str(e)}")
+        return StreamingResponse(text_events(*fallback_analysis(request)),
+                                 media_type="text/event-stream", headers=SSE_HEADERS)
+    
+    return StreamingResponse(relay_events(first, deltas, key), media_type="text/event-stream", headers=SSE_HEADERS)
 
 def get_fallback_analysis():
     """Fallback analysis when OpenRouter is unavailable"""
@@ -340,30 +591,6 @@ def get_fallback_analysis():
 ✨ בהצלחה במסע שלך עם AI! יש לך את כל הכלים להצליח!
     """.strip()
 
-@app.get("/api/surveys/stats")
-async def get_stats():
-    """Get survey statistics"""
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
-        # Total count
-        cursor.execute("SELECT COUNT(*) FROM survey_responses")
-        total = cursor.fetchone()[0]
-        
-        # Today's count
-        cursor.execute("""
-            SELECT COUNT(*) FROM survey_responses 
-            WHERE DATE(created_at) = DATE('now')
-        """)
-        today = cursor.fetchone()[0]
-        
-        conn.close()
-        return {"total": total, "today": today}
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching stats: {str(e)}")
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Pydantic models for AI Navigator API
+"""
+
+from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional, get_type_hints
+
+class SurveyResponse(BaseModel):
+    age_group: Optional[str] = None
+    current_activity: Optional[List[str]] = None
+    self_definition: Optional[str] = None
+    self_definition_other: Optional[str] = None
+    known_ai_tools: Optional[List[str]] = None
+    ai_usage_level: Optional[str] = None
+    ai_experience: Optional[str] = None
+    ai_learning_method: Optional[List[str]] = None
+    ai_learning_method_other: Optional[str] = None
+    main_ai_goal: Optional[str] = None
+    main_ai_goal_other: Optional[str] = None
+    biggest_ai_challenge: Optional[str] = None
+    ai_creation_dream: Optional[str] = None
+    future_ai_impact: Optional[str] = None
+    monthly_spending: Optional[str] = None
+    ai_barriers: Optional[List[str]] = None
+    barriers_other: Optional[str] = None
+    community_interest: Optional[str] = None
+    specific_ai_help: Optional[str] = None
+    specific_ai_help_other: Optional[str] = None
+    investment_willingness: Optional[str] = None
+    platform_access: Optional[str] = None
+    first_name: Optional[str] = None
+    email: Optional[str] = None
+    completion_time: Optional[int] = None
+    ai_analysis: Optional[str] = None
+
+class AnalysisRequest(BaseModel):
+    prompt: str
+    add_context_from_internet: bool = False
+    # Structured answers enable the local rule-based engine; "auto" uses it only
+    # when the LLM tier is saturated, "local" always, "llm" never (except as fallback)
+    responses: Optional[SurveyResponse] = None
+    engine: Literal["auto", "llm", "local"] = "auto"
+
+class CrosstabRequest(BaseModel):
+    # Two or more categorical or multi-select fields; multi-select answers count once per choice
+    dimensions: List[str]
+    # Count only responses whose answer is one of the listed values (any of them, for multi-select)
+    filters: Dict[str, List[str]] = {}
+
+# Field names a client may request, e.g. via ?fields= projections
+SURVEY_FIELDS = list(getattr(SurveyResponse, "model_fields", None) or SurveyResponse.__fields__)
+
+# SurveyResponse's field types, compiled into exact type checks for plain records
+_PLAIN_TYPES = {Optional[str]: str, Optional[int]: int, Optional[List[str]]: list}
+_FIELD_HINTS = get_type_hints(SurveyResponse)
+_FIELD_TYPES = {field: _PLAIN_TYPES.get(_FIELD_HINTS[field]) for field in SURVEY_FIELDS}
+_EMPTY_SURVEY = dict.fromkeys(SURVEY_FIELDS)
+_STR_ONLY = {str}
+
+def _plain_survey(record: dict) -> Optional[dict]:
+    """The model_dump() of a record that already has SurveyResponse's exact types, else None
+
+    Unknown keys are dropped like the model drops them. Anything the model would
+    coerce or reject returns None, so validate_survey defers to the model itself.
+    """
+    survey = _EMPTY_SURVEY.copy()
+    for field, value in record.items():
+        if value is None or field not in survey:
+            continue
+        expected = _FIELD_TYPES[field]
+        if type(value) is not expected:
+            return None
+        if expected is list and not set(map(type, value)) <= _STR_ONLY:
+            return None
+        survey[field] = value
+    return survey
+
+def validate_survey(record: dict) -> dict:
+    """Validate a raw record with SurveyResponse and return it as a plain dict"""
+    survey = _plain_survey(record)
+    if survey is not None:
+        return survey
+    if hasattr(SurveyResponse, "model_validate"):
+        return SurveyResponse.model_validate(record).model_dump()
+    return SurveyResponse(**record).dict()
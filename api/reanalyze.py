@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Regenerate ai_analysis for stored survey responses
+
+Streams rows missing an analysis (with --stale, also rows analyzed under a
+different model or system prompt) in id order, analyzes them with bounded
+parallelism through the LLM scheduler, and writes results back in batched
+transactions. Progress is checkpointed to a JSON file after every batch, so an
+interrupted run resumes where it stopped.
+
+Uses the same OPENROUTER_* settings as the API; point OPENROUTER_BASE_URL at
+bench/mock_openai.py to try it locally.
+
+Usage:
+    python reanalyze.py --dry-run
+    python reanalyze.py --stale --concurrency 8 --batch-size 50
+    python reanalyze.py --restart   # ignore the checkpoint and rescan from the start
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+# Load environment variables (before local modules read their configuration)
+load_dotenv()
+
+import llm
+from database import (
+    DB_FILE, ConnectionPool, connect, count_unanalyzed, fetch_unanalyzed, init_db,
+    update_survey_analyses,
+)
+from llm import (
+    ANALYSIS_VERSION, LLM_RATE_BURST, LLM_RATE_PER_MINUTE, CircuitOpen, LLMScheduler,
+    build_analysis_prompt, request_analysis,
+)
+
+# Rows fetched per read while streaming candidates
+FETCH_ROWS = 200
+
+def load_checkpoint(path: str, version: str, stale: bool) -> int:
+    """Last fully processed id from a checkpoint written for the same run settings"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("version") != version or checkpoint.get("stale") != stale:
+        return 0
+    return checkpoint.get("last_id", 0)
+
+def save_checkpoint(path: str, state: dict):
+    """Write the checkpoint atomically so a crash never leaves it half written"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+class Reanalyzer:
+    """Bounded-parallel analysis of candidate rows with batched, checkpointed writes"""
+
+    def __init__(self, pool: ConnectionPool, scheduler: LLMScheduler, concurrency: int, batch_size: int,
+                 checkpoint_path: str, stale: bool):
+        self.pool = pool
+        self.scheduler = scheduler
+        self.concurrency = max(concurrency, 1)
+        self.batch_size = max(batch_size, 1)
+        self.checkpoint_path = checkpoint_path
+        self.stale = stale
+        self.analyzed = 0
+        self.failed = 0
+        self.last_id = 0
+        self._dispatched = 0
+        self._unfinished = OrderedDict()  # dispatched ids not yet written, ascending
+        self._pending = []  # (survey_id, analysis, version) waiting for the next batch write
+
+    async def run(self, after_id: int, limit: int = None):
+        """Process every candidate with id > after_id (at most `limit` rows)"""
+        self.last_id = self._dispatched = after_id
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [asyncio.create_task(self._work(queue)) for _ in range(self.concurrency)]
+        try:
+            remaining = limit
+            while remaining is None or remaining > 0:
+                page = FETCH_ROWS if remaining is None else min(FETCH_ROWS, remaining)
+                surveys = await self.pool.read(fetch_unanalyzed, self._dispatched, page,
+                                               ANALYSIS_VERSION if self.stale else None)
+                if not surveys:
+                    break
+                for survey in surveys:
+                    self._unfinished[survey["id"]] = True
+                    self._dispatched = survey["id"]
+                    await queue.put(survey)
+                if remaining is not None:
+                    remaining -= len(surveys)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await self._flush()
+
+    async def _work(self, queue: asyncio.Queue):
+        while True:
+            survey = await queue.get()
+            if survey is None:
+                return
+            try:
+                analysis = await self._analyze(survey)
+            except Exception as e:
+                print(f"survey {survey['id']}: {str(e)}", file=sys.stderr)
+                self.failed += 1
+                self._unfinished.pop(survey["id"], None)
+                continue
+            self._pending.append((survey["id"], analysis, ANALYSIS_VERSION))
+            if len(self._pending) >= self.batch_size:
+                await self._flush()
+
+    async def _analyze(self, survey: dict) -> str:
+        prompt = build_analysis_prompt(survey)
+        while True:
+            try:
+                return await request_analysis(prompt, self.scheduler)
+            except CircuitOpen as e:
+                # Upstream is down: wait for the breaker instead of failing every row
+                await asyncio.sleep(e.retry_after)
+
+    async def _flush(self):
+        batch, self._pending = self._pending, []
+        if batch:
+            await self.pool.write(update_survey_analyses, batch)
+            self.analyzed += len(batch)
+            for survey_id, _, _ in batch:
+                self._unfinished.pop(survey_id, None)
+        # Everything below the oldest unwritten id is done (written or failed)
+        self.last_id = next(iter(self._unfinished)) - 1 if self._unfinished else self._dispatched
+        save_checkpoint(self.checkpoint_path, {
+            "version": ANALYSIS_VERSION,
+            "stale": self.stale,
+            "last_id": self.last_id,
+            "analyzed": self.analyzed,
+            "failed": self.failed,
+            "updated_at": time.time(),
+        })
+        print(json.dumps({"analyzed": self.analyzed, "failed": self.failed, "last_id": self.last_id}),
+              file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate AI analyses for stored surveys")
+    parser.add_argument("--db", default=DB_FILE, help=f"database path (default {DB_FILE})")
+    parser.add_argument("--stale", action="store_true",
+                        help="also redo analyses made with another model or system prompt")
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel LLM calls (default 4)")
+    parser.add_argument("--batch-size", type=int, default=50, help="results per write transaction (default 50)")
+    parser.add_argument("--rate-per-minute", type=float, default=LLM_RATE_PER_MINUTE,
+                        help=f"LLM calls per minute, 0 for unlimited (default {LLM_RATE_PER_MINUTE:g})")
+    parser.add_argument("--limit", type=int, help="process at most this many rows")
+    parser.add_argument("--checkpoint", help="checkpoint file (default <db>.reanalyze.json)")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    parser.add_argument("--dry-run", action="store_true", help="only count the rows to process")
+    args = parser.parse_args()
+
+    checkpoint_path = args.checkpoint or f"{args.db}.reanalyze.json"
+    init_db(args.db)
+    after_id = 0 if args.restart else load_checkpoint(checkpoint_path, ANALYSIS_VERSION, args.stale)
+
+    if args.dry_run:
+        conn = connect(args.db, readonly=True)
+        try:
+            pending = count_unanalyzed(conn, after_id, ANALYSIS_VERSION if args.stale else None)
+        finally:
+            conn.close()
+        print(json.dumps({"pending": pending, "after_id": after_id, "version": ANALYSIS_VERSION}))
+        return 0
+
+    if not llm.openai_client:
+        print("OPENROUTER_API_KEY is not set", file=sys.stderr)
+        return 1
+
+    # The queue timeout only matters if more callers than slots exist; workers never exceed slots
+    scheduler = LLMScheduler(max_in_flight=args.concurrency, max_queue=args.concurrency,
+                             queue_timeout=3600, rate_per_minute=args.rate_per_minute, burst=LLM_RATE_BURST)
+    pool = ConnectionPool(args.db, readers=1, workers=1)
+    reanalyzer = Reanalyzer(pool, scheduler, args.concurrency, args.batch_size, checkpoint_path, args.stale)
+    started = time.perf_counter()
+    try:
+        asyncio.run(reanalyzer.run(after_id, args.limit))
+    except KeyboardInterrupt:
+        print(f"Interrupted; resume from id {reanalyzer.last_id}", file=sys.stderr)
+        return 130
+    finally:
+        pool.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "analyzed": reanalyzer.analyzed,
+        "failed": reanalyzer.failed,
+        "last_id": reanalyzer.last_id,
+        "retries": scheduler.retries,
+        "version": ANALYSIS_VERSION,
+        "seconds": round(elapsed, 3),
+    }
+    print(json.dumps(summary))
+    return 1 if reanalyzer.failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
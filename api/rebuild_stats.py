@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Check or rebuild the trigger-maintained statistics counters
+
+Usage:
+    python rebuild_stats.py            # report mismatches, exit 1 if any
+    python rebuild_stats.py --rebuild  # recompute every counter, the term index and trend rollups
+"""
+
+import argparse
+import json
+import sys
+
+from database import DB_FILE, check_stats, connect, init_db, rebuild_stats
+from terms import rebuild_terms
+from trends import rebuild_trends
+
+def main():
+    parser = argparse.ArgumentParser(description="Check or rebuild survey statistics counters")
+    parser.add_argument("--db", default=DB_FILE, help=f"database path (default {DB_FILE})")
+    parser.add_argument("--rebuild", action="store_true", help="recompute counters from survey_responses")
+    args = parser.parse_args()
+
+    init_db(args.db)
+    conn = connect(args.db)
+    try:
+        if args.rebuild:
+            with conn:
+                rebuild_stats(conn)
+                rebuild_terms(conn)
+                rebuild_trends(conn)
+            print("Statistics rebuilt")
+        mismatches = check_stats(conn)
+    finally:
+        conn.close()
+
+    for mismatch in mismatches:
+        print(json.dumps(mismatch, ensure_ascii=False))
+    print(f"{len(mismatches)} mismatched counters")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
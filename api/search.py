@@ -0,0 +1,164 @@
+"""
+Full-text search over the free-text answers and stored analyses
+
+survey_search is an external-content FTS5 table over survey_responses: it
+stores only the inverted index, triggers keep it in step with every insert,
+update and delete, and snippets are cut from the original rows. Results are
+ranked by bm25 with generated analyses weighted below what respondents wrote.
+
+bm25 costs time per matching row, so very common terms are ranked among their
+most recent SEARCH_RANK_WINDOW matches only; that bounds the query time
+regardless of table size. Older matches are paged after the ranked ones, newest
+first. Snippets are built for the returned page alone.
+"""
+
+import os
+import re
+import sqlite3
+from typing import List
+
+from serialization import dumps_text
+
+# Indexed columns, in FTS column order
+SEARCH_FIELDS = [
+    'self_definition_other', 'ai_learning_method_other', 'main_ai_goal_other',
+    'biggest_ai_challenge', 'ai_creation_dream', 'future_ai_impact',
+    'barriers_other', 'specific_ai_help_other', 'ai_analysis',
+]
+# bm25 weights per column: answers count double an LLM-written analysis
+SEARCH_WEIGHTS = [2.0] * (len(SEARCH_FIELDS) - 1) + [1.0]
+
+SNIPPET_TOKENS = 12
+
+# Most recent matches considered for ranking; 0 ranks every match
+SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "10000"))
+
+_COLUMNS = ", ".join(SEARCH_FIELDS)
+
+def _values(row: str) -> str:
+    return ", ".join(f"{row}.{field}" for field in SEARCH_FIELDS)
+
+SEARCH_SCHEMA = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS survey_search USING fts5(
+        {_COLUMNS},
+        content = 'survey_responses',
+        content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2'
+    );
+
+    -- Superseded by survey_responses_search_add, which bulk inserts skip
+    DROP TRIGGER IF EXISTS survey_responses_search_insert;
+    CREATE TRIGGER IF NOT EXISTS survey_responses_search_add
+    AFTER INSERT ON survey_responses BEGIN
+        INSERT INTO survey_search (rowid, {_COLUMNS}) VALUES (NEW.id, {_values("NEW")});
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_search_delete
+    AFTER DELETE ON survey_responses BEGIN
+        INSERT INTO survey_search (survey_search, rowid, {_COLUMNS}) VALUES ('delete', OLD.id, {_values("OLD")});
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_search_update
+    AFTER UPDATE OF {_COLUMNS} ON survey_responses BEGIN
+        INSERT INTO survey_search (survey_search, rowid, {_COLUMNS}) VALUES ('delete', OLD.id, {_values("OLD")});
+        INSERT INTO survey_search (rowid, {_COLUMNS}) VALUES (NEW.id, {_values("NEW")});
+    END;
+"""
+
+REBUILD_SEARCH_SQL = "INSERT INTO survey_search (survey_search) VALUES ('rebuild')"
+INDEX_SEARCH_SQL = f"""
+    INSERT INTO survey_search (rowid, {_COLUMNS})
+    SELECT id, {_COLUMNS} FROM survey_responses WHERE id BETWEEN ? AND ?
+"""
+_BM25 = f"bm25(survey_search, {', '.join(map(str, SEARCH_WEIGHTS))})"
+# A page of the ranked window: the ?2 most recent matches, best score first
+RANKED_SQL = f"""
+    WITH recent AS (
+        SELECT rowid AS id, {_BM25} AS score
+        FROM survey_search
+        WHERE survey_search MATCH ?1
+        ORDER BY rowid DESC
+        LIMIT ?2
+    )
+    SELECT id, score FROM recent
+    ORDER BY score, id DESC
+    LIMIT ?3 OFFSET ?4
+"""
+# Size and oldest row of the ranked window
+WINDOW_SQL = """
+    SELECT COUNT(*), MIN(id) FROM (
+        SELECT rowid AS id FROM survey_search
+        WHERE survey_search MATCH ?1
+        ORDER BY rowid DESC
+        LIMIT ?2
+    )
+"""
+# Matches older than the window, newest first
+OLDER_SQL = f"""
+    SELECT rowid, {_BM25} FROM survey_search
+    WHERE survey_search MATCH ?1 AND rowid < ?2
+    ORDER BY rowid DESC
+    LIMIT ?3 OFFSET ?4
+"""
+SNIPPET_SQL = f"""
+    WITH page AS (SELECT key AS position, value AS id FROM json_each(?2))
+    SELECT page.id, survey_responses.created_at,
+           snippet(survey_search, -1, '<mark>', '</mark>', '…', {SNIPPET_TOKENS})
+    FROM page
+    JOIN survey_responses ON survey_responses.id = page.id
+    JOIN survey_search ON survey_search.rowid = page.id AND survey_search MATCH ?1
+    ORDER BY page.position
+"""
+
+# "quoted phrases", prefix* words and plain words
+_QUERY_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+def match_query(text: str) -> str:
+    """FTS5 MATCH expression for user input: every word or "phrase" must appear
+
+    Everything is quoted, so FTS5 operators and punctuation in the input are
+    searched for literally instead of raising syntax errors. A trailing * on a
+    word is kept as a prefix search.
+    """
+    terms = []
+    for phrase, word in _QUERY_TOKEN_RE.findall(text):
+        value = phrase if phrase else word
+        prefix = not phrase and value.endswith("*") and len(value) > 1
+        value = value.rstrip("*") if prefix else value
+        if value.strip():
+            terms.append('"' + value.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+def rebuild_search(conn: sqlite3.Connection):
+    """Re-index every row from survey_responses (caller's transaction)"""
+    conn.execute(REBUILD_SEARCH_SQL)
+
+def index_search(conn: sqlite3.Connection, first_id: int, last_id: int):
+    """Index rows first_id..last_id, bulk inserted without the per-row trigger"""
+    conn.execute(INDEX_SEARCH_SQL, (first_id, last_id))
+
+def search_surveys(conn: sqlite3.Connection, query: str, limit: int, offset: int = 0) -> dict:
+    """Matches with a highlighted snippet each, best first
+
+    The SEARCH_RANK_WINDOW most recent matches come first, ranked by score;
+    older matches follow newest first, so every match is reachable by paging.
+    """
+    expression = match_query(query)
+    if not expression:
+        return {"results": [], "next_offset": None}
+    # One extra row tells whether another page exists without counting every match
+    window = SEARCH_RANK_WINDOW or -1
+    page = conn.execute(RANKED_SQL, (expression, window, limit + 1, offset)).fetchall()
+    if SEARCH_RANK_WINDOW and len(page) <= limit:
+        ranked, oldest = conn.execute(WINDOW_SQL, (expression, window)).fetchone()
+        if ranked == SEARCH_RANK_WINDOW:
+            page += conn.execute(OLDER_SQL, (expression, oldest, limit + 1 - len(page),
+                                             max(0, offset - ranked))).fetchall()
+
+    scores = dict(page[:limit])
+    rows = conn.execute(SNIPPET_SQL, (expression, dumps_text(list(scores)))).fetchall()
+    results: List[dict] = [
+        {"id": survey_id, "created_at": created_at, "snippet": snippet, "score": round(-scores[survey_id], 4)}
+        for survey_id, created_at, snippet in rows
+    ]
+    return {"results": results, "next_offset": offset + limit if len(page) > limit else None}
@@ -0,0 +1,43 @@
+"""
+JSON encoding for responses and stored list columns
+
+Uses orjson when it is installed (and FAST_JSON is not "0"), otherwise the
+stdlib encoder. Both produce compact UTF-8 output, so clients and stored list
+columns read the same either way.
+"""
+
+import json
+import os
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency: fall back to the stdlib encoder
+    orjson = None
+
+FAST_JSON = os.getenv("FAST_JSON", "1") != "0" and orjson is not None
+
+if FAST_JSON:
+    def dumps(data: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes"""
+        return orjson.dumps(data)
+
+    loads = orjson.loads
+else:
+    def dumps(data: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes"""
+        return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
+
+def dumps_text(data: Any) -> str:
+    """Serialize to a compact JSON string, e.g. for a TEXT column"""
+    return dumps(data).decode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,144 @@
+"""
+Term-frequency index over the free-text answers
+
+Each insert tokenizes ai_creation_dream, biggest_ai_challenge and
+future_ai_impact and adds the counts, in the same transaction, to an all-time
+table (indexed by count for top-K reads) and a per-day table for time windows.
+The dashboard word clouds read the top terms instead of scanning every answer.
+"""
+
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from typing import Iterable, List, Optional
+
+# Free-text answers that are indexed
+TEXT_FIELDS = ['ai_creation_dream', 'biggest_ai_challenge', 'future_ai_impact']
+
+# Shorter tokens are mostly prefixes and particles
+MIN_TERM_LENGTH = 3
+
+# Same list as the dashboard's WordAnalysis, plus common function words
+STOP_WORDS = frozenset([
+    'של', 'את', 'עם', 'על', 'כל', 'לא', 'כן', 'אני', 'אתה', 'הוא', 'היא', 'אנחנו', 'אתם',
+    'הם', 'הן', 'לי', 'לך', 'לו', 'לה', 'לנו', 'לכם', 'להם', 'להן', 'ו', 'ב', 'ל', 'מ', 'ש',
+    'כ', 'זה', 'זו', 'אלה', 'אלו', 'יש', 'אין', 'או', 'אם', 'אבל', 'כמו', 'רק', 'גם', 'אז',
+    'מה', 'מי', 'איך', 'כמה', 'איפה', 'מתי', 'למה', 'כי', 'יותר', 'פחות', 'מאוד', 'קצת',
+    'הרבה', 'שלי', 'שלך', 'שלו', 'שלה', 'שלנו', 'שלכם', 'שלהם', 'שלהן',
+    'זאת', 'היה', 'היו', 'יהיה', 'להיות', 'אותי', 'אותך', 'אותו', 'אותה', 'אותם', 'כדי',
+    'עוד', 'אולי', 'הזה', 'הזאת', 'שזה', 'שאני', 'בין', 'לפני', 'אחרי', 'תוך', 'עליו',
+    'אצלי', 'לכל', 'בכל', 'ככה', 'פשוט', 'באמת', 'דברים', 'משהו',
+    'the', 'and', 'for', 'with', 'that', 'this',
+])
+
+# Niqqud and cantillation marks, dropped so pointed and unpointed spellings match
+_MARKS_RE = re.compile("[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7]")
+# Geresh / gershayim are normalized to ASCII so ע"י and ע״י are one term
+# (chained str.replace: str.translate is far slower on non-ASCII text)
+_QUOTES = [("\u05F3", "'"), ("\u05F4", '"'), ("\u2019", "'"), ("\u201D", '"')]
+# Letters and digits; an inner quote is kept for acronyms and loan words (צה"ל, צ'אט)
+_TOKEN_RE = re.compile(r"[^\W_]+(?:['\"][^\W_]+)*")
+
+TERMS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS survey_term_counts (
+        field TEXT NOT NULL,
+        term TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (field, term)
+    ) WITHOUT ROWID;
+    -- All-time top-K is a walk down this index
+    CREATE INDEX IF NOT EXISTS idx_survey_term_counts_top
+        ON survey_term_counts (field, count DESC);
+
+    CREATE TABLE IF NOT EXISTS survey_term_daily_counts (
+        field TEXT NOT NULL,
+        day TEXT NOT NULL,
+        term TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (field, day, term)
+    ) WITHOUT ROWID;
+"""
+
+ADD_TERM_SQL = """
+    INSERT INTO survey_term_counts (field, term, count) VALUES (?, ?, ?)
+    ON CONFLICT (field, term) DO UPDATE SET count = count + excluded.count
+"""
+ADD_DAILY_TERM_SQL = """
+    INSERT INTO survey_term_daily_counts (field, day, term, count) VALUES (?, ?, ?, ?)
+    ON CONFLICT (field, day, term) DO UPDATE SET count = count + excluded.count
+"""
+SELECT_DAYS_SQL = "SELECT id, DATE(created_at) FROM survey_responses WHERE id BETWEEN ? AND ?"
+SELECT_TEXT_SQL = f"SELECT DATE(created_at), {', '.join(TEXT_FIELDS)} FROM survey_responses"
+TOP_TERMS_SQL = """
+    SELECT term, count FROM survey_term_counts
+    WHERE field = ? AND count > 0
+    ORDER BY count DESC
+    LIMIT ?
+"""
+TOP_TERMS_WINDOW_SQL = """
+    SELECT term, SUM(count) AS total FROM survey_term_daily_counts
+    WHERE field = ? AND day >= ? AND day <= ?
+    GROUP BY term
+    HAVING total > 0
+    ORDER BY total DESC, term
+    LIMIT ?
+"""
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Indexable terms in a free-text answer, in order (repeats kept)"""
+    if not text:
+        return []
+    for quote, ascii_quote in _QUOTES:
+        text = text.replace(quote, ascii_quote)
+    text = _MARKS_RE.sub("", text).casefold()
+    return [token for token in _TOKEN_RE.findall(text)
+            if len(token) >= MIN_TERM_LENGTH and token not in STOP_WORDS]
+
+def _count(rows: Iterable[tuple]) -> Counter:
+    """(field, day, term) counts for (day, survey dict) pairs"""
+    texts = defaultdict(list)
+    for day, data in rows:
+        for field in TEXT_FIELDS:
+            value = data.get(field)
+            if isinstance(value, str):
+                texts[field, day].append(value)
+    # Tokens never span a newline, so each (field, day) is tokenized as one text
+    counts = Counter()
+    for (field, day), values in texts.items():
+        for term, count in Counter(tokenize("\n".join(values))).items():
+            counts[field, day, term] = count
+    return counts
+
+def _add_counts(conn: sqlite3.Connection, counts: Counter):
+    totals = Counter()
+    for (field, _, term), count in counts.items():
+        totals[field, term] += count
+    conn.executemany(ADD_TERM_SQL, ((field, term, count) for (field, term), count in totals.items()))
+    conn.executemany(ADD_DAILY_TERM_SQL, ((field, day, term, count)
+                                          for (field, day, term), count in counts.items() if day))
+
+def index_terms(conn: sqlite3.Connection, first_id: int, rows: list):
+    """Count terms for rows just inserted with ids first_id.. (caller's transaction)"""
+    if not rows:
+        return
+    days = dict(conn.execute(SELECT_DAYS_SQL, (first_id, first_id + len(rows) - 1)))
+    _add_counts(conn, _count((days.get(first_id + offset), data) for offset, data in enumerate(rows)))
+
+def rebuild_terms(conn: sqlite3.Connection):
+    """Recount every term from survey_responses (caller's transaction)"""
+    conn.execute("DELETE FROM survey_term_counts")
+    conn.execute("DELETE FROM survey_term_daily_counts")
+    rows = ((row[0], dict(zip(TEXT_FIELDS, row[1:]))) for row in conn.execute(SELECT_TEXT_SQL))
+    _add_counts(conn, _count(rows))
+
+def fetch_top_terms(conn: sqlite3.Connection, fields: List[str], k: int,
+                    start: Optional[str] = None, end: Optional[str] = None) -> dict:
+    """Top k [term, count] pairs per field, all time or for days start..end (inclusive)"""
+    terms = {}
+    for field in fields:
+        if start is None and end is None:
+            rows = conn.execute(TOP_TERMS_SQL, (field, k))
+        else:
+            rows = conn.execute(TOP_TERMS_WINDOW_SQL, (field, start or "", end or "9999-12-31", k))
+        terms[field] = [list(row) for row in rows]
+    return terms
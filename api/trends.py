@@ -0,0 +1,139 @@
+"""
+Submission trends from an hourly and daily rollup
+
+Triggers add every response to its UTC hour and day in survey_rollups, with
+the completion time total and the two interest counters the dashboard plots.
+A trend query reads one row per bucket (weeks are summed from days), so a year
+of daily data is a few hundred rows no matter how many responses exist.
+"""
+
+import sqlite3
+from typing import Optional
+
+
+TREND_BUCKETS = ['hour', 'day', 'week']
+
+# Answers counted per bucket, as plotted by the dashboard's trend chart
+COMMUNITY_INTERESTED = 'ברור שכן'
+PLATFORM_REQUESTED = 'כן'
+
+# strftime format of each stored bucket's start (UTC, same text form as created_at)
+_ROLLUP_FORMATS = {'hour': '%Y-%m-%d %H:00:00', 'day': '%Y-%m-%d'}
+
+_ADD_TO_BUCKET = """ON CONFLICT (bucket, start) DO UPDATE SET
+            count = count + excluded.count,
+            completion_total = completion_total + excluded.completion_total,
+            completion_count = completion_count + excluded.completion_count,
+            community_interested = community_interested + excluded.community_interested,
+            platform_requests = platform_requests + excluded.platform_requests"""
+
+def _rollup_statements(row: str, delta: str) -> str:
+    """Trigger body adding the OLD or NEW row to its hour and day buckets"""
+    return "".join(f"""
+        INSERT INTO survey_rollups (bucket, start, count, completion_total, completion_count,
+                                    community_interested, platform_requests)
+        SELECT '{bucket}', strftime('{fmt}', {row}.created_at), {delta},
+               {delta} * COALESCE({row}.completion_time, 0),
+               {delta} * ({row}.completion_time IS NOT NULL),
+               {delta} * ({row}.community_interest IS '{COMMUNITY_INTERESTED}'),
+               {delta} * ({row}.platform_access IS '{PLATFORM_REQUESTED}')
+        WHERE {row}.created_at IS NOT NULL
+        {_ADD_TO_BUCKET};"""
+        for bucket, fmt in _ROLLUP_FORMATS.items())
+
+TRENDS_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS survey_rollups (
+        bucket TEXT NOT NULL,
+        start TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        completion_total INTEGER NOT NULL,
+        completion_count INTEGER NOT NULL,
+        community_interested INTEGER NOT NULL,
+        platform_requests INTEGER NOT NULL,
+        PRIMARY KEY (bucket, start)
+    ) WITHOUT ROWID;
+
+    -- Superseded by survey_responses_rollup_add, which bulk inserts skip
+    DROP TRIGGER IF EXISTS survey_responses_rollup_insert;
+    CREATE TRIGGER IF NOT EXISTS survey_responses_rollup_add
+    AFTER INSERT ON survey_responses BEGIN{_rollup_statements("NEW", "1")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_rollup_delete
+    AFTER DELETE ON survey_responses BEGIN{_rollup_statements("OLD", "-1")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS survey_responses_rollup_update
+    AFTER UPDATE OF created_at, completion_time, community_interest, platform_access
+    ON survey_responses BEGIN{_rollup_statements("OLD", "-1")}{_rollup_statements("NEW", "1")}
+    END;
+"""
+
+_ROLLUP_SELECT_SQL = f"""
+    INSERT INTO survey_rollups (bucket, start, count, completion_total, completion_count,
+                                community_interested, platform_requests)
+    SELECT ?, strftime(?, created_at), COUNT(*), COALESCE(SUM(completion_time), 0), COUNT(completion_time),
+           SUM(community_interest IS '{COMMUNITY_INTERESTED}'), SUM(platform_access IS '{PLATFORM_REQUESTED}')
+    FROM survey_responses
+    WHERE created_at IS NOT NULL{{range}}
+    GROUP BY 2
+"""
+REBUILD_ROLLUP_SQL = _ROLLUP_SELECT_SQL.replace("{range}", "")
+# Rows first_id..last_id only, added to existing buckets
+ADD_ROLLUP_SQL = _ROLLUP_SELECT_SQL.replace("{range}", " AND id BETWEEN ? AND ?") + _ADD_TO_BUCKET
+_POINT_COLUMNS = """SUM(count), SUM(completion_total), SUM(completion_count),
+           SUM(community_interested), SUM(platform_requests)"""
+SELECT_ROLLUP_SQL = f"""
+    SELECT start, {_POINT_COLUMNS} FROM survey_rollups
+    WHERE bucket = ? AND start >= ? AND start <= ?
+    GROUP BY start
+    ORDER BY start
+"""
+# Weeks start on Monday: 'weekday 0' moves to the next Sunday (or stays), -6 days back to Monday
+SELECT_WEEKS_SQL = f"""
+    SELECT DATE(start, 'weekday 0', '-6 days') AS week, {_POINT_COLUMNS} FROM survey_rollups
+    WHERE bucket = 'day' AND start >= ? AND start <= ?
+    GROUP BY week
+    ORDER BY week
+"""
+
+def rebuild_trends(conn: sqlite3.Connection):
+    """Recompute every rollup bucket from survey_responses (caller's transaction)"""
+    conn.execute("DELETE FROM survey_rollups")
+    for bucket, fmt in _ROLLUP_FORMATS.items():
+        conn.execute(REBUILD_ROLLUP_SQL, (bucket, fmt))
+
+def add_trends(conn: sqlite3.Connection, first_id: int, last_id: int):
+    """Add rows first_id..last_id, bulk inserted without the per-row trigger"""
+    for bucket, fmt in _ROLLUP_FORMATS.items():
+        conn.execute(ADD_ROLLUP_SQL, (bucket, fmt, first_id, last_id))
+
+def fetch_trends(conn: sqlite3.Connection, bucket: str, start: Optional[str] = None,
+                 end: Optional[str] = None) -> dict:
+    """Per-bucket counts between two 'YYYY-MM-DD HH:MM:SS' UTC instants (inclusive)
+
+    Hour buckets overlapping the window are included; day and week buckets are
+    matched by date, and weeks are clipped to the days inside the window.
+    """
+    if bucket not in TREND_BUCKETS:
+        raise ValueError(f"Unknown bucket: {bucket}")
+    if bucket == 'hour':
+        low = start[:13] + ":00:00" if start else ""
+        rows = conn.execute(SELECT_ROLLUP_SQL, ('hour', low, end or "9999"))
+    else:
+        low, high = (start or "")[:10], (end or "9999")[:10]
+        rows = conn.execute(SELECT_WEEKS_SQL, (low, high)) if bucket == 'week' else \
+            conn.execute(SELECT_ROLLUP_SQL, ('day', low, high))
+
+    points = []
+    for point_start, count, completion_total, completion_count, interested, requested in rows:
+        if not count:
+            continue
+        points.append({
+            "start": point_start,
+            "count": count,
+            "avg_completion_time": round(completion_total / completion_count, 1) if completion_count else None,
+            "community_interested": interested,
+            "platform_requests": requested,
+        })
+    return {"bucket": bucket, "points": points}
@@ -56,17 +56,114 @@ class APIClient {
     return this.request('/api/surveys/stats');
   }
 
+  async getSurveyAggregates() {
+    return this.request('/api/surveys/aggregates');
+  }
+
+  // Ranked full-text search; results carry an id, a <mark>-highlighted snippet and a score
+  async searchSurveys(q, { limit = 20, offset = 0 } = {}) {
+    const params = new URLSearchParams({ q, limit, offset });
+    return this.request(`/api/surveys/search?${params}`);
+  }
+
+  // Counts per combination of field values, e.g. crosstab(['ai_barriers', 'age_group'])
+  async getSurveyCrosstab(dimensions, filters = {}) {
+    return this.request('/api/surveys/crosstab', {
+      method: 'POST',
+      body: { dimensions, filters },
+    });
+  }
+
+  // Counts per hour/day/week from the server-side rollup (from/to are ISO dates, UTC)
+  async getSurveyTrends({ bucket = 'day', from = null, to = null } = {}) {
+    const params = new URLSearchParams({ bucket });
+    if (from) params.set('from', from);
+    if (to) params.set('to', to);
+    return this.request(`/api/surveys/trends?${params}`);
+  }
+
+  // Top terms per free-text field, from the server-side term index
+  async getSurveyTerms({ k = 15, from = null, to = null } = {}) {
+    const params = new URLSearchParams({ k });
+    if (from) params.set('from', from);
+    if (to) params.set('to', to);
+    return this.request(`/api/surveys/terms?${params}`);
+  }
+
+  // Background analysis of a stored survey
+  async requestSurveyAnalysis(id) {
+    return this.request(`/api/surveys/${id}/analysis`, { method: 'POST' });
+  }
+
+  async getSurveyAnalysis(id) {
+    return this.request(`/api/surveys/${id}/analysis`);
+  }
+
   // AI Analysis
-  async generateAnalysis(prompt) {
+  // responses (optional) lets the server answer instantly with its local engine when busy
+  async generateAnalysis(prompt, responses = null) {
     return this.request('/api/ai/analyze', {
       method: 'POST',
       body: {
         prompt: prompt,
-        add_context_from_internet: false
+        add_context_from_internet: false,
+        ...(responses && { responses })
       }
     });
   }
 
+  // Streaming AI Analysis (Server-Sent Events); onDelta receives text as it arrives
+  async streamAnalysis(prompt, onDelta, responses = null) {
+    const response = await fetch(`${this.baseURL}/api/ai/analyze/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        prompt,
+        add_context_from_internet: false,
+        ...(responses && { responses })
+      }),
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let analysis = '';
+    let finished = false;
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      const events = buffer.split('\n\n');
+      buffer = events.pop();
+      for (const event of events) {
+        const dataLine = event.split('\n').find(line => line.startsWith('data: '));
+        if (!dataLine) continue;
+        const data = JSON.parse(dataLine.slice(6));
+        if (event.startsWith('event: error')) {
+          throw new Error(data.detail);
+        }
+        if (event.startsWith('event: done')) {
+          finished = true;
+        }
+        if (data.delta) {
+          analysis += data.delta;
+          onDelta?.(data.delta, analysis);
+        }
+      }
+    }
+
+    if (!finished) {
+      throw new Error('Analysis stream ended early');
+    }
+    return analysis;
+  }
+
   // Health check
   async healthCheck() {
     return this.request('/health');
@@ -85,14 +182,76 @@ export const SurveyResponse = {
   async list(orderBy = "-created_date") {
     const response = await apiClient.getSurveys();
     return response.surveys || [];
+  },
+
+  async aggregates() {
+    return apiClient.getSurveyAggregates();
+  },
+
+  async terms(options) {
+    return apiClient.getSurveyTerms(options);
+  },
+
+  async crosstab(dimensions, filters) {
+    return apiClient.getSurveyCrosstab(dimensions, filters);
+  },
+
+  async trends(options) {
+    return apiClient.getSurveyTrends(options);
+  },
+
+  async search(q, options) {
+    return apiClient.searchSurveys(q, options);
+  },
+
+  // Queue a server-side analysis for a saved survey. Resolves with the stored analysis,
+  // or with the instant local `preview` while the job is still pending; onUpdate then
+  // receives the stored analysis once the job finishes (polled for up to upgradeTimeout)
+  async analyze(id, { interval = 1000, timeout = 5000, upgradeTimeout = 120000, onUpdate = null } = {}) {
+    const pending = job => job.status === 'queued' || job.status === 'running';
+    const poll = async (job, deadline, stopEarly) => {
+      while (pending(job) && !stopEarly(job) && Date.now() <= deadline) {
+        await new Promise(resolve => setTimeout(resolve, interval));
+        job = await apiClient.getSurveyAnalysis(id);
+      }
+      return job;
+    };
+
+    let job = await apiClient.requestSurveyAnalysis(id);
+    if (pending(job)) {
+      // The status endpoint carries the preview; the POST answer does not
+      job = await apiClient.getSurveyAnalysis(id);
+    }
+    job = await poll(job, Date.now() + timeout, job => !!job.preview);
+
+    if (job.status === 'done') {
+      return job.analysis;
+    }
+    if (!pending(job)) {
+      throw new Error(job.error || 'Analysis failed');
+    }
+    if (!job.preview) {
+      throw new Error('Analysis timed out');
+    }
+    if (onUpdate) {
+      poll(job, Date.now() + upgradeTimeout, () => false)
+        .then(finished => finished.status === 'done' && finished.analysis && onUpdate(finished.analysis))
+        .catch(error => console.log('Analysis upgrade unavailable:', error));
+    }
+    return job.preview;
   }
 };
 
-export const InvokeLLM = async ({ prompt, add_context_from_internet = false }) => {
-  const response = await apiClient.generateAnalysis(prompt);
+export const InvokeLLM = async ({ prompt, add_context_from_internet = false, responses = null }) => {
+  const response = await apiClient.generateAnalysis(prompt, responses);
   return response.analysis;
 };
 
+// Same as InvokeLLM, but onDelta(delta, analysisSoFar) sees the text as it streams in
+export const StreamLLM = async ({ prompt, responses = null, onDelta = null }) => {
+  return apiClient.streamAnalysis(prompt, onDelta, responses);
+};
+
 // Simple SavedAnalysis export to prevent import errors
 export const SavedAnalysis = {
   async create(data) {
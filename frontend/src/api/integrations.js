@@ -1,2 +1,2 @@
 // AI integrations using the new FastAPI backend
-export { InvokeLLM } from './apiClient.js'; 
\ No newline at end of file
+export { InvokeLLM, StreamLLM } from './apiClient.js'; 
\ No newline at end of file
@@ -18,37 +18,32 @@ const ChartCard = ({ title, children }) => (
   </Card>
 );
 
-export default function BarriersAnalysis({ data }) {
-  const learningMethods = _.chain(data)
-    .flatMap('ai_learning_method')
-    .compact()
-    .countBy()
-    .map((count, name) => ({ name, count }))
-    .sortBy('count')
-    .reverse()
-    .value();
-
-  const mainGoals = _.chain(data)
-    .countBy('main_ai_goal')
-    .map((value, name) => ({ name, value }))
-    .filter(item => item.name && item.name !== 'undefined')
-    .sortBy('value')
-    .reverse()
-    .value();
-    
-  const specificHelp = _.chain(data)
-    .countBy('specific_ai_help')
+// Server distributions are [{ name, value }], most common first; otherwise count the rows
+const distribution = (distributions, data, field) => distributions
+  ? distributions[field] || []
+  : _.chain(data)
+    .countBy(field)
     .map((value, name) => ({ name, value }))
     .filter(item => item.name && item.name !== 'undefined')
     .sortBy('value')
     .reverse()
     .value();
 
-  const investmentWillingness = _.chain(data)
-    .countBy('investment_willingness')
-    .map((value, name) => ({ name, value }))
-    .filter(item => item.name && item.name !== 'undefined')
-    .value();
+export default function BarriersAnalysis({ data = [], distributions = null }) {
+  const learningMethods = distributions
+    ? (distributions.ai_learning_method || []).map(({ name, value }) => ({ name, count: value }))
+    : _.chain(data)
+      .flatMap('ai_learning_method')
+      .compact()
+      .countBy()
+      .map((count, name) => ({ name, count }))
+      .sortBy('count')
+      .reverse()
+      .value();
+
+  const mainGoals = distribution(distributions, data, 'main_ai_goal');
+  const specificHelp = distribution(distributions, data, 'specific_ai_help');
+  const investmentWillingness = distribution(distributions, data, 'investment_willingness');
 
   return (
     <div className="space-y-6">
@@ -6,19 +6,26 @@ import _ from 'lodash';
 
 const COLORS = ['#34d399', '#94a3b8', '#f59e0b', '#86efac', '#cbd5e1', '#fcd34d'];
 
-export default function DemographicsCharts({ data }) {
-  const ageData = _.chain(data)
-    .countBy('age_group')
-    .map((count, name) => ({ name, count }))
-    .sortBy('name')
-    .value();
+// Server distributions are [{ name, value }], most common first
+const toCounts = options => options.map(({ name, value }) => ({ name, count: value }));
 
-  const activityData = _.chain(data)
-    .countBy('current_activity')
-    .map((count, name) => ({ name, count }))
-    .sortBy('count')
-    .reverse()
-    .value();
+export default function DemographicsCharts({ data = [], distributions = null }) {
+  const ageData = distributions
+    ? _.sortBy(toCounts(distributions.age_group || []), 'name')
+    : _.chain(data)
+      .countBy('age_group')
+      .map((count, name) => ({ name, count }))
+      .sortBy('name')
+      .value();
+
+  const activityData = distributions
+    ? toCounts(distributions.current_activity || [])
+    : _.chain(data)
+      .countBy('current_activity')
+      .map((count, name) => ({ name, count }))
+      .sortBy('count')
+      .reverse()
+      .value();
 
   return (
     <Card className="h-full bg-white shadow-lg border-0">
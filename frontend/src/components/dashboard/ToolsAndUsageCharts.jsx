@@ -6,20 +6,25 @@ import _ from 'lodash';
 
 const COLORS = ['#34d399', '#f59e0b', '#86efac', '#cbd5e1', '#94a3b8'];
 
-export default function ToolsAndUsageCharts({ data }) {
-  const usageLevelData = _.chain(data)
-    .countBy('ai_usage_level')
-    .map((value, name) => ({ name, value }))
-    .value();
+export default function ToolsAndUsageCharts({ data = [], distributions = null }) {
+  // Server distributions are [{ name, value }], most common first
+  const usageLevelData = distributions
+    ? distributions.ai_usage_level || []
+    : _.chain(data)
+      .countBy('ai_usage_level')
+      .map((value, name) => ({ name, value }))
+      .value();
 
-  const toolKnowledgeData = _.chain(data)
-    .flatMap('known_ai_tools')
-    .compact()
-    .countBy()
-    .map((count, name) => ({ name, count }))
-    .sortBy('count')
-    .reverse()
-    .value();
+  const toolKnowledgeData = distributions
+    ? (distributions.known_ai_tools || []).map(({ name, value }) => ({ name, count: value }))
+    : _.chain(data)
+      .flatMap('known_ai_tools')
+      .compact()
+      .countBy()
+      .map((count, name) => ({ name, count }))
+      .sortBy('count')
+      .reverse()
+      .value();
 
   return (
     <Card className="bg-white shadow-lg border-0">
@@ -4,7 +4,7 @@ import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContai
 import _ from 'lodash';
 import { format, parseISO, startOfDay, subDays, isValid } from 'date-fns';
 
-export default function TrendsChart({ data = [] }) {
+export default function TrendsChart({ data = [], trends = null }) {
   // Helper function to safely parse dates
   const safeParseDateString = (dateString) => {
     if (!dateString) return null;
@@ -23,7 +23,23 @@ export default function TrendsChart({ data = [] }) {
     return startOfDay(date);
   });
 
-  const trendData = last30Days.map(date => {
+  // Daily points from the API rollup, keyed by UTC date; days without responses are absent.
+  // Local midnight is the previous UTC date east of Greenwich, so these 30 days are
+  // counted in UTC (as the server buckets them), not from last30Days
+  const pointsByDay = trends ? _.keyBy(trends, 'start') : null;
+  const last30UtcDays = Array.from({ length: 30 }, (_, i) =>
+    new Date(Date.now() - (29 - i) * 24 * 60 * 60 * 1000).toISOString().slice(0, 10)
+  );
+
+  const trendData = pointsByDay ? last30UtcDays.map(day => {
+    const point = pointsByDay[day];
+    return {
+      date: `${day.slice(5, 7)}/${day.slice(8, 10)}`,
+      responses: point?.count || 0,
+      interestedInCommunity: point?.community_interested || 0,
+      platformRequests: point?.platform_requests || 0
+    };
+  }) : last30Days.map(date => {
     const dayResponses = data.filter(response => {
       const responseDate = safeParseDateString(response.created_date);
       if (!responseDate) return false;
@@ -4,19 +4,20 @@ import _ from 'lodash';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 
-const HEBREW_STOP_WORDS = [
+const HEBREW_STOP_WORDS = new Set([
   'של', 'את', 'עם', 'על', 'כל', 'לא', 'כן', 'אני', 'אתה', 'הוא', 'היא', 'אנחנו', 'אתם',
   'הם', 'הן', 'לי', 'לך', 'לו', 'לה', 'לנו', 'לכם', 'להם', 'להן', 'ו', 'ב', 'ל', 'מ', 'ש',
   'כ', 'זה', 'זו', 'אלה', 'אלו', 'יש', 'אין', 'או', 'אם', 'אבל', 'כמו', 'רק', 'גם', 'אז',
   'מה', 'מי', 'איך', 'כמה', 'איפה', 'מתי', 'למה', 'כי', 'יותר', 'פחות', 'מאוד', 'קצת',
   'הרבה', 'שלי', 'שלך', 'שלו', 'שלה', 'שלנו', 'שלכם', 'שלהם', 'שלהן'
-];
+]);
 
-export default function WordAnalysis({ data, field, title }) {
-  const wordFrequencies = _.chain(data)
+export default function WordAnalysis({ data, field, title, terms }) {
+  // Precomputed [word, count] pairs from the API; counted from the raw answers otherwise
+  const wordFrequencies = terms ? terms.slice(0, 15) : _.chain(data)
     .flatMap(item => (item[field] || '').split(/[\s,.\-?!()"{}[\]:]+/))
     .map(word => word.trim())
-    .filter(word => word.length > 2 && !HEBREW_STOP_WORDS.includes(word.toLowerCase()))
+    .filter(word => word.length > 2 && !HEBREW_STOP_WORDS.has(word.toLowerCase()))
     .countBy()
     .toPairs()
     .sortBy(pair => -pair[1])
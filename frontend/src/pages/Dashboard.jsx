@@ -20,6 +20,9 @@ import AllResponses from "../components/dashboard/AllResponses";
 export default function Dashboard() {
   const navigate = useNavigate();
   const [responses, setResponses] = useState([]);
+  const [aggregates, setAggregates] = useState(null);
+  const [terms, setTerms] = useState(null);
+  const [trends, setTrends] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
 
   useEffect(() => {
@@ -34,15 +37,37 @@ export default function Dashboard() {
       }
     };
     fetchData();
+    // Chart distributions and stat card counts come from the server's counters;
+    // the charts count the downloaded rows themselves if this fails
+    SurveyResponse.aggregates()
+      .then(setAggregates)
+      .catch(e => console.error("Failed to fetch aggregates:", e));
+    // Word clouds come from the server's term index; WordAnalysis counts locally if this fails
+    SurveyResponse.terms()
+      .then(setTerms)
+      .catch(e => console.error("Failed to fetch term counts:", e));
+    // Daily rollup for the trend chart's 30 day window
+    const from = new Date(Date.now() - 29 * 24 * 60 * 60 * 1000).toISOString().slice(0, 10);
+    SurveyResponse.trends({ bucket: 'day', from })
+      .then(result => setTrends(result.points))
+      .catch(e => console.error("Failed to fetch trends:", e));
   }, [navigate]);
 
-  const averageCompletionTime = responses.length > 0 
-    ? (_.sumBy(responses, 'completion_time') / responses.length / 60).toFixed(1)
-    : 0;
-  
-  const interestedInCommunity = responses.filter(r => r.community_interest === "ברור שכן").length;
-  const wantsPlatformAccess = responses.filter(r => r.platform_access === "כן").length;
-  const experiencedUsers = responses.filter(r => r.ai_usage_level === "כן – ואני משתמש באופן קבוע").length;
+  const distributions = aggregates?.distributions;
+  const countAnswers = (field, value) => distributions
+    ? distributions[field]?.find(option => option.name === value)?.value || 0
+    : responses.filter(r => r[field] === value).length;
+
+  const totalResponses = aggregates ? aggregates.total : responses.length;
+  const averageCompletionTime = aggregates
+    ? ((aggregates.completion_time.average || 0) / 60).toFixed(1)
+    : responses.length > 0
+      ? (_.sumBy(responses, 'completion_time') / responses.length / 60).toFixed(1)
+      : 0;
+
+  const interestedInCommunity = countAnswers('community_interest', "ברור שכן");
+  const wantsPlatformAccess = countAnswers('platform_access', "כן");
+  const experiencedUsers = countAnswers('ai_usage_level', "כן – ואני משתמש באופן קבוע");
 
   if (isLoading) {
     return (
@@ -62,7 +87,7 @@ export default function Dashboard() {
     );
   }
   
-  if (responses.length === 0) {
+  if (totalResponses === 0) {
     return (
       <div className="p-8" dir="rtl" style={{ direction: 'rtl', textAlign: 'right' }}>
         <Alert>
@@ -82,7 +107,7 @@ export default function Dashboard() {
       
       {/* Stat Cards */}
       <div className="grid gap-6 md:grid-cols-2 lg:grid-cols-5 mb-8">
-        <StatCard title="סך הכל משיבים" value={responses.length} />
+        <StatCard title="סך הכל משיבים" value={totalResponses} />
         <StatCard title="מעוניינים בקהילה" value={interestedInCommunity} />
         <StatCard title="רוצים גישה לפלטפורמה" value={wantsPlatformAccess} />
         <StatCard title="משתמשים מנוסים" value={experiencedUsers} />
@@ -96,25 +121,25 @@ export default function Dashboard() {
 
       {/* Trends Chart */}
       <div className="mb-8">
-        <TrendsChart data={responses} />
+        <TrendsChart data={responses} trends={trends} />
       </div>
 
       {/* Charts */}
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-8 mb-8">
-        <DemographicsCharts data={responses} />
-        <ToolsAndUsageCharts data={responses} />
+        <DemographicsCharts data={responses} distributions={distributions} />
+        <ToolsAndUsageCharts data={responses} distributions={distributions} />
       </div>
 
       {/* Barriers Analysis */}
       <div className="mb-8">
-        <BarriersAnalysis data={responses} />
+        <BarriersAnalysis data={responses} distributions={distributions} />
       </div>
 
       {/* Word Analysis */}
       <div className="grid grid-cols-1 lg:grid-cols-2 xl:grid-cols-3 gap-8 mb-8">
-        <WordAnalysis data={responses} field="ai_creation_dream" title="חלומות ליצירה עם AI" />
-        <WordAnalysis data={responses} field="biggest_ai_challenge" title="אתגרים נפוצים" />
-        <WordAnalysis data={responses} field="future_ai_impact" title="שאיפות עתידיות" />
+        <WordAnalysis data={responses} terms={terms?.ai_creation_dream} field="ai_creation_dream" title="חלומות ליצירה עם AI" />
+        <WordAnalysis data={responses} terms={terms?.biggest_ai_challenge} field="biggest_ai_challenge" title="אתגרים נפוצים" />
+        <WordAnalysis data={responses} terms={terms?.future_ai_impact} field="future_ai_impact" title="שאיפות עתידיות" />
       </div>
 
       {/* Recent Responses */}
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from "react";
 import { SurveyResponse } from "@/api/entities";
-import { InvokeLLM } from "@/api/integrations";
+import { InvokeLLM, StreamLLM } from "@/api/integrations";
 import { motion, AnimatePresence } from "framer-motion";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
@@ -237,26 +237,42 @@ export default function Survey() {
         כתוב בעברית, בטון חם, מעודד ומקצועי, באורך של כ-250 מילים.
       `;
 
-      const analysis = await InvokeLLM({
-        prompt: analysisPrompt,
-        add_context_from_internet: false
-      });
-
-      setAiAnalysis(analysis);
-
-      // Save to database - handle both logged in and anonymous users
+      // Save first, then let the server generate and store the analysis in the background
       const completionTime = Math.round((Date.now() - startTime) / 1000);
+      let analysis;
       try {
-        await SurveyResponse.create({
+        const saved = await SurveyResponse.create({
           ...responses,
-          completion_time: completionTime,
-          ai_analysis: analysis
+          completion_time: completionTime
         });
-      } catch (saveError) {
-        // If saving fails (user not logged in), that's okay - they still get the analysis
-        console.log('Could not save response (user not logged in):', saveError);
+        // Shows the instant local preview if the LLM job is still running, then swaps in its result
+        analysis = await SurveyResponse.analyze(saved.id, { onUpdate: setAiAnalysis });
+      } catch (backgroundError) {
+        // Saving failed or the analysis is not ready within a few seconds - analyze directly;
+        // the server local engine answers at once when the LLM is busy
+        console.log('Background analysis unavailable, analyzing directly:', backgroundError);
+        try {
+          // Show the analysis view with the first words instead of waiting for the whole text
+          analysis = await StreamLLM({
+            prompt: analysisPrompt,
+            responses,
+            onDelta: (delta, text) => {
+              setAiAnalysis(text);
+              setIsComplete(true);
+            }
+          });
+        } catch (streamError) {
+          console.log('Analysis stream unavailable, requesting it whole:', streamError);
+          analysis = await InvokeLLM({
+            prompt: analysisPrompt,
+            add_context_from_internet: false,
+            responses
+          });
+        }
       }
 
+      setAiAnalysis(analysis);
+
       setIsComplete(true);
     } catch (error) {
       console.error('Error generating analysis:', error);
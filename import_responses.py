@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Bulk import survey responses from a JSON array or NDJSON file
+
+Every record is validated with the SurveyResponse model; valid rows are written
+with executemany in a single transaction and invalid rows are reported.
+
+Usage:
+    python import_responses.py export.ndjson
+    python import_responses.py legacy.json --db api/survey_responses.db
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+# The API modules live in api/, next to the database they default to
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api")
+sys.path.insert(0, API_DIR)
+
+from bulk import is_ndjson, prepare_import
+from database import DB_FILE, bulk_insert_surveys, connect, init_db
+
+DEFAULT_DB = os.path.join(API_DIR, DB_FILE)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import survey responses")
+    parser.add_argument("file", help="JSON array or NDJSON file ('-' for stdin)")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"database path (default {DEFAULT_DB})")
+    parser.add_argument("--format", choices=["auto", "json", "ndjson"], default="auto")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, do not insert")
+    parser.add_argument("--max-errors", type=int, default=20, help="errors to print (default 20)")
+    args = parser.parse_args()
+
+    # Nothing here forms reference cycles; collecting while the parsed records
+    # pile up only rescans them over and over
+    gc.disable()
+    started = time.perf_counter()
+    timings = {}
+    if args.file == "-":
+        text = sys.stdin.buffer.read()
+    else:
+        with open(args.file, "rb") as f:
+            text = f.read()
+
+    ndjson = is_ndjson(text) if args.format == "auto" else args.format == "ndjson"
+    rows, errors = prepare_import(text, ndjson)
+    timings["validate_seconds"] = round(time.perf_counter() - started, 3)
+
+    result = {"inserted": 0, "first_id": None, "last_id": None}
+    if rows and not args.dry_run:
+        init_db(args.db)
+        conn = connect(args.db)
+        try:
+            inserting = time.perf_counter()
+            with conn:
+                result = bulk_insert_surveys(conn, rows)
+            timings["insert_seconds"] = round(time.perf_counter() - inserting, 3)
+        finally:
+            conn.close()
+
+    elapsed = time.perf_counter() - started
+    for error in errors[:args.max_errors]:
+        print(f"row {error['row']}: {error['error']}", file=sys.stderr)
+    if len(errors) > args.max_errors:
+        print(f"... and {len(errors) - args.max_errors} more errors", file=sys.stderr)
+
+    summary = {**result, "valid": len(rows), "failed": len(errors), "seconds": round(elapsed, 3), **timings}
+    if elapsed > 0:
+        summary["rows_per_second"] = round(len(rows) / elapsed)
+    print(json.dumps(summary))
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())